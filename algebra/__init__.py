@@ -6,3 +6,7 @@ from .ops import *
 from .pretty import *
 from .algebra import *
 from .function import *
+from .graph import *
+from .serialise import *
+from .plan import *
+from .cache import *
@@ -1,18 +1,28 @@
+import threading
+import weakref
 from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
 
 from . import _dispatch
-from .util import get_subclasses
+from .util import get_subclasses, identical, fingerprint, MethodCache
 
 __all__ = [
     "proven",
+    "interning",
+    "lazy",
     "Element",
     "One",
     "Zero",
     "Wrapped",
     "Join",
     "pretty_print",
+    "iter_render",
     "add",
     "mul",
+    "power",
+    "lazy_add",
+    "lazy_mul",
+    "lazy_power",
     "get_algebra",
     "new",
 ]
@@ -33,53 +43,405 @@ def proven():
     return _proven_level
 
 
-class Element(metaclass=ABCMeta):
+repr_max_chars = 10_000  #: Maximum number of characters of `repr` of an element.
+
+_interning = False  #: Intern elements upon construction.
+_interned = weakref.WeakValueDictionary()  #: Table of interned elements.
+_equality_types = weakref.WeakKeyDictionary()  #: Cache for `_equality_type`.
+
+
+@contextmanager
+def interning():
+    """Context manager in which the construction of an element returns an existing
+    element if a structurally identical one already exists. Elements are
+    structurally identical if they are of the same type and were constructed from
+    identical arguments, where child elements must be the same objects. Since the
+    children of interned elements are interned too, this means that equality of
+    interned elements is often just an identity check.
+
+    Only elements which define their own equality are interned: elements which are
+    equal only to themselves are always constructed afresh.
+    """
+    global _interning
+    previous, _interning = _interning, True
+    try:
+        yield
+    finally:
+        _interning = previous
+
+
+_lazy = False  #: Record operations without simplifying.
+
+
+@contextmanager
+def lazy(enabled=True):
+    """Context manager in which operations on elements construct the resulting
+    elements directly, without applying any simplification rules. This makes
+    building large elements cheap. Use :func:`.ops.simplify.simplify` to apply the
+    simplification rules afterwards in one pass.
+
+    Args:
+        enabled (bool, optional): Enable lazy construction. Set to `False` to
+            temporarily construct elements eagerly again. Defaults to `True`.
+    """
+    global _lazy
+    previous, _lazy = _lazy, enabled
+    try:
+        yield
+    finally:
+        _lazy = previous
+
+
+def _equality_type(t):
+    """Find the class which determines equality for instances of a type.
+
+    Args:
+        t (type): Type of the instances.
+
+    Returns:
+        type: First class in the MRO of `t` which defines `__eq__`.
+    """
+    try:
+        return _equality_types[t]
+    except KeyError:
+        for c in t.__mro__:
+            if "__eq__" in c.__dict__:
+                _equality_types[t] = c
+                return c
+
+
+class _EqualityState(threading.local):
+    depth = 0  #: Current nesting of comparisons of elements in this thread.
+
+
+_equality = _EqualityState()  #: State of comparisons of elements per thread.
+_max_equality_depth = 100  #: Nesting after which elements are compared bottom-up.
+
+
+class _DeepEquality(Exception):
+    """Comparisons of elements nest too deeply."""
+
+
+def _guard_equality(eq):
+    """Guard the equality of a class of elements against deep elements. If
+    comparisons nest too deeply, the outermost comparison is repeated bottom-up.
+
+    Args:
+        eq (function): `__eq__` of the class.
+
+    Returns:
+        function: Guarded `__eq__`.
+    """
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        state = _equality
+        if state.depth >= _max_equality_depth:
+            raise _DeepEquality()
+        state.depth += 1
+        try:
+            return eq.__get__(self, type(self))(other)
+        except _DeepEquality:
+            if state.depth > 1:
+                raise
+            return _equal_bottom_up(self, other)
+        finally:
+            state.depth -= 1
+
+    return __eq__
+
+
+def _equal_bottom_up(x, y):
+    # Replace equal elements by one representative from the leaves up. Then every
+    # comparison compares elements with identical children, which does not nest.
+    # Import here to prevent a circular import.
+    from .graph import children, rebuild, walk
+
+    canonical = {}
+    replacements = {}
+    for root in (x, y):
+        for e in walk(root):
+            if id(e) not in replacements:
+                e_new = rebuild(e, tuple(replacements[id(c)] for c in children(e)))
+                replacements[id(e)] = canonical.setdefault(e_new, e_new)
+    return replacements[id(x)] is replacements[id(y)]
+
+
+class _Identical:
+    """Wrap an object such that it is compared with :func:`.util.identical`.
+
+    Args:
+        x (object): Object to wrap.
+    """
+
+    __slots__ = ("x",)
+
+    def __init__(self, x):
+        self.x = x
+
+    def __eq__(self, other):
+        return isinstance(other, _Identical) and identical(self.x, other.x)
+
+    def __hash__(self):
+        return fingerprint(self.x)
+
+
+def _intern_key(x):
+    """Convert an argument of a constructor to a key for the table of interned
+    elements. The key respects :func:`.util.identical`.
+
+    Args:
+        x (object): Argument.
+
+    Returns:
+        object: Hashable key.
+    """
+    if isinstance(x, (int, float, str, type(None))):
+        return x
+    elif isinstance(x, (tuple, list)):
+        return type(x), tuple(_intern_key(xi) for xi in x)
+    else:
+        return _Identical(x)
+
+
+class ElementMeta(ABCMeta):
+    """Metaclass of elements, which implements interning."""
+
+    def __call__(cls, *args, **kw_args):
+        if not _interning or _equality_type(cls) is Element:
+            return ABCMeta.__call__(cls, *args, **kw_args)
+        key = (cls, _intern_key(args), _intern_key(sorted(kw_args.items())))
+        try:
+            return _interned[key]
+        except KeyError:
+            e = ABCMeta.__call__(cls, *args, **kw_args)
+            _interned[key] = e
+            return e
+
+
+class SpecialisationCache:
+    """Cache for `.algebra.new`.
+
+    For every algebra, the cache keeps track of the subclasses of the algebra and,
+    for every requested type, of the most specific specialisation. When a new type
+    of element is defined, the subclasses of the algebras are updated and the
+    specialisations which the new type could affect are discarded. When the
+    methods of `.algebra.get_algebra` change, all specialisations are discarded.
+
+    Attributes:
+        hits (int): Number of lookups which were answered from the cache.
+        misses (int): Number of lookups which required a specialisation to be
+            determined.
+    """
+
+    def __init__(self):
+        self._algebra_types = {}
+        self._specialisations = {}
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, algebra, t):
+        """Find the specialisation of a type for an algebra.
+
+        Args:
+            algebra (type): Algebra.
+            t (type): Type to specialise.
+
+        Returns:
+            type: Specialisation of `t` for `algebra`.
+        """
+        if self._version != _get_algebra_cache.version:
+            self._specialisations.clear()
+            self._version = _get_algebra_cache.version
+        try:
+            specialisation = self._specialisations[algebra, t]
+            self.hits += 1
+        except KeyError:
+            specialisation = self._specialise(algebra, t)
+            self._specialisations[algebra, t] = specialisation
+            self.misses += 1
+        if specialisation is None:
+            raise RuntimeError(
+                f'Could not determine "{t.__name__}" for algebra "{algebra.__name__}".'
+            )
+        return specialisation
+
+    def _specialise(self, algebra, t):
+        try:
+            algebra_types = self._algebra_types[algebra]
+        except KeyError:
+            algebra_types = set(get_subclasses(algebra))
+            self._algebra_types[algebra] = algebra_types
+
+        # Determine candidates. Reject types which belong to a more specific
+        # algebra, and reject concrete parametric types.
+        candidates = [
+            c
+            for c in algebra_types
+            if issubclass(c, t)
+            and _algebra_method(c) is _algebra_method(algebra)
+            and not (
+                hasattr(c, "parametric")
+                and c.parametric
+                and hasattr(c, "concrete")
+                and c.concrete
+            )
+        ]
+
+        # The most specific types are the ones we are looking for. There should only
+        # be a single one.
+        candidates = filter_most_specific(candidates)
+        return candidates[0] if len(candidates) == 1 else None
+
+    def register(self, c):
+        """Register a newly defined type of element.
+
+        Args:
+            c (type): New type.
+        """
+        for algebra, algebra_types in self._algebra_types.items():
+            if issubclass(c, algebra):
+                algebra_types.add(c)
+        for algebra, t in list(self._specialisations.keys()):
+            if issubclass(c, t):
+                del self._specialisations[algebra, t]
+
+    def clear(self):
+        """Clear the cache."""
+        self._algebra_types.clear()
+        self._specialisations.clear()
+
+
+new_cache = SpecialisationCache()  #: Cache for `.algebra.new`.
+
+
+class Element(metaclass=ElementMeta):
     """An element in a algebra.
 
     Elements can be added and multiplied.
     """
 
+    # `_reversed` caches a weak reference to the result of :func:`.function.reverse`.
+    # It is stored on the element, so it is freed together with the element.
+    __slots__ = ("_hash", "_reversed", "__weakref__")
+
+    def __init_subclass__(cls, **kw_args):
+        super().__init_subclass__(**kw_args)
+        if "__eq__" in cls.__dict__:
+            # Defining `__eq__` without defining `__hash__` sets `__hash__` to
+            # `None`. Restore the structural hash instead.
+            if cls.__dict__.get("__hash__", 0) is None:
+                cls.__hash__ = Element.__hash__
+            cls.__eq__ = _guard_equality(cls.__dict__["__eq__"])
+        new_cache.register(cls)
+
     def __eq__(self, other):
         return self is other
 
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            pass
+        # Compute the hashes of the children before the hashes of their parents, so
+        # computing the hash does not recurse and deep elements can be hashed. Import
+        # here to prevent a circular import.
+        from .graph import children
+
+        visited = set()
+        stack = [(self, False)]
+        while stack:
+            e, expanded = stack.pop()
+            if expanded:
+                e._hash = e.structural_hash()
+            elif id(e) not in visited and not hasattr(e, "_hash"):
+                visited.add(id(e))
+                stack.append((e, True))
+                stack.extend((c, False) for c in children(e))
+        return self._hash
+
+    def __reduce__(self):
+        # Import here to prevent a circular import.
+        from .serialise import _reduce
+
+        return _reduce(self)
+
+    def structural_hash(self):
+        """Compute a hash of the structure of the element. The hash must be consistent
+        with equality: equal elements must have equal hashes. This method should be
+        implemented by elements which define equality in terms of their contents.
+
+        Returns:
+            int: Hash of the element.
+        """
+        equality_type = _equality_type(type(self))
+        if equality_type is Element:
+            # The element is only equal to itself.
+            return object.__hash__(self)
+        else:
+            return hash(equality_type)
+
     def __mul__(self, other):
-        return mul(self, other)
+        if _lazy:
+            return lazy_mul(self, other)
+        return _mul_cache(self, other)
 
     def __rmul__(self, other):
-        return mul(other, self)
+        if _lazy:
+            return lazy_mul(other, self)
+        return _mul_cache(other, self)
 
     def __add__(self, other):
-        return add(self, other)
+        if _lazy:
+            return lazy_add(self, other)
+        return _add_cache(self, other)
 
     def __radd__(self, other):
-        return add(other, self)
+        if _lazy:
+            return lazy_add(other, self)
+        return _add_cache(other, self)
 
     def __neg__(self):
-        return mul(-1, self)
+        if _lazy:
+            return lazy_mul(-1, self)
+        return _mul_cache(-1, self)
 
     def __sub__(self, other):
-        return add(self, -other)
+        if _lazy:
+            return lazy_add(self, -other)
+        return _add_cache(self, -other)
 
     def __rsub__(self, other):
-        return add(other, -self)
+        if _lazy:
+            return lazy_add(other, -self)
+        return _add_cache(other, -self)
 
     @_dispatch
-    def __pow__(self, power: int, modulo=None):
-        if power < 0:
+    def __pow__(self, exponent: int, modulo=None):
+        if exponent < 0:
             raise ValueError("Cannot raise to a negative power.")
-        elif power == 0:
+        elif exponent == 0:
             return 1
+        elif _lazy:
+            return lazy_power(self, exponent)
         else:
-            k = self
-            for _ in range(power - 1):
-                k *= self
-        return k
+            return power(self, exponent)
 
     @property
     def num_terms(self):
         """Number of terms"""
         return 1
 
+    def terms(self):
+        """Iterate over the terms.
+
+        Returns:
+            iterator: Iterator over the terms.
+        """
+        yield self
+
     def term(self, i):
         """Get a specific term.
 
@@ -99,6 +461,14 @@ class Element(metaclass=ABCMeta):
         """Number of factors"""
         return 1
 
+    def factors(self):
+        """Iterate over the factors.
+
+        Returns:
+            iterator: Iterator over the factors.
+        """
+        yield self
+
     def factor(self, i):
         """Get a specific factor.
 
@@ -118,26 +488,63 @@ class Element(metaclass=ABCMeta):
         return self.__class__.__name__
 
     def __repr__(self):
-        return self.display()
+        return self.display(max_chars=repr_max_chars)
 
     def __str__(self):
         return self.display()
 
     @_dispatch
-    def display(self, formatter):
+    def display(self, formatter, max_terms=None, max_depth=None, max_chars=None):
         """Display the element.
 
         Args:
             formatter (object, optional): Function to format values.
+            max_terms (int, optional): Maximum number of elements to display of
+                any join. Remaining elements are replaced by `...`.
+            max_depth (int, optional): Maximum depth to display. Deeper elements
+                are replaced by `...`.
+            max_chars (int, optional): Maximum number of characters to display.
+                If the rendering is longer, it is cut off and `...` is appended.
 
         Returns:
             str: Element as a string.
         """
-        return pretty_print(self, formatter)
+        pieces = self.iter_render(formatter, max_terms=max_terms, max_depth=max_depth)
+        if max_chars is None:
+            return "".join(pieces)
+        rendering, length = [], 0
+        for piece in pieces:
+            rendering.append(piece)
+            length += len(piece)
+            if length > max_chars:
+                # Stop rendering as soon as the limit is exceeded.
+                return "".join(rendering)[:max_chars] + "..."
+        return "".join(rendering)
+
+    @_dispatch
+    def display(self, **kw_args):
+        return self.display(lambda x: x, **kw_args)
 
     @_dispatch
-    def display(self):
-        return self.display(lambda x: x)
+    def iter_render(self, formatter, max_terms=None, max_depth=None):
+        """Render the element piece by piece. This can be used to write large
+        renderings to a file without constructing the full rendering in memory.
+
+        Args:
+            formatter (object, optional): Function to format values.
+            max_terms (int, optional): Maximum number of elements to display of
+                any join. Remaining elements are replaced by `...`.
+            max_depth (int, optional): Maximum depth to display. Deeper elements
+                are replaced by `...`.
+
+        Returns:
+            iterator: Iterator over pieces of the rendering.
+        """
+        return iter_render(self, formatter, max_terms, max_depth)
+
+    @_dispatch
+    def iter_render(self, **kw_args):
+        return self.iter_render(lambda x: x, **kw_args)
 
     def render(self, formatter):
         """Render the element.
@@ -158,6 +565,8 @@ class Element(metaclass=ABCMeta):
 class One(Element):
     """The constant `1`."""
 
+    __slots__ = ()
+
     def render(self, formatter):
         return "1"
 
@@ -169,6 +578,8 @@ class One(Element):
 class Zero(Element):
     """The constant `0`."""
 
+    __slots__ = ()
+
     def render(self, formatter):
         return "0"
 
@@ -184,9 +595,14 @@ class Wrapped(Element):
         e (:class:`.algebra.Element`): Element to wrap.
     """
 
+    __slots__ = ("e",)
+
     def __init__(self, e):
         self.e = e
 
+    def structural_hash(self):
+        return hash((_equality_type(type(self)), hash(self.e)))
+
     def __getitem__(self, item):
         if item == 0:
             return self.e
@@ -199,22 +615,38 @@ class Wrapped(Element):
 
 
 class Join(Element):
-    """Two wrapped elements.
+    """Joined elements.
 
     Args:
-        e1 (:class:`.algebra.Element`): First element to wrap.
-        e2 (:class:`.algebra.Element`): Second element to wrap.
+        *es (:class:`.algebra.Element`): Elements to join.
     """
 
-    def __init__(self, e1, e2):
-        self.e1 = e1
-        self.e2 = e2
+    __slots__ = ("es",)
+
+    def __init__(self, *es):
+        self.es = es
+
+    def structural_hash(self):
+        return hash((_equality_type(type(self)), tuple(hash(e) for e in self.es)))
+
+    @property
+    def e1(self):
+        return self[0]
+
+    @property
+    def e2(self):
+        return self[1]
 
     def __getitem__(self, item):
+        # Present the join as a binary tree which leans to the left: the first index
+        # gives all but the last element and the second index gives the last element.
         if item == 0:
-            return self.e1
+            if len(self.es) == 2:
+                return self.es[0]
+            else:
+                return type(self)(*self.es[:-1])
         elif item == 1:
-            return self.e2
+            return self.es[-1]
         else:
             raise IndexError("Index out of range.")
 
@@ -223,6 +655,27 @@ class Join(Element):
         pass
 
 
+def flatten(es, t):
+    """Flatten nested joins of a particular type.
+
+    Args:
+        es (tuple[:class:`.algebra.Element`]): Elements to flatten.
+        t (type): Type of the joins to flatten.
+
+    Returns:
+        tuple[:class:`.algebra.Element`]: `es` where every instance of `t` is replaced
+            by the elements that it joins.
+    """
+    # Concatenating tuples for every element would take quadratic time.
+    flat = []
+    for e in es:
+        if isinstance(e, t):
+            flat.extend(e.es)
+        else:
+            flat.append(e)
+    return tuple(flat)
+
+
 @_dispatch
 def pretty_print(el: Element, formatter):
     """Pretty print an element with a minimal number of parentheses.
@@ -237,6 +690,23 @@ def pretty_print(el: Element, formatter):
     return el.render(formatter)
 
 
+@_dispatch
+def iter_render(el: Element, formatter, max_terms, max_depth):
+    """Pretty print an element piece by piece.
+
+    Args:
+        el (:class:`.algebra.Element`): Element to print.
+        formatter (object): Formatter for values.
+        max_terms (int or None): Maximum number of elements to display of any
+            join.
+        max_depth (int or None): Maximum depth to display.
+
+    Returns:
+        iterator: Iterator over pieces of the pretty printed `el`.
+    """
+    yield pretty_print(el, formatter)
+
+
 @_dispatch
 def add(a, b):
     """Add two elements.
@@ -271,6 +741,76 @@ def mul(a, b):
     )
 
 
+_add_cache = MethodCache(add)  #: Resolved methods of `.algebra.add`.
+_mul_cache = MethodCache(mul)  #: Resolved methods of `.algebra.mul`.
+
+
+@_dispatch
+def lazy_add(a, b):
+    """Add two elements without simplifying.
+
+    Args:
+        a (:class:`.algebra.Element`): First element in summation.
+        b (:class:`.algebra.Element`): Second element in summation.
+
+    Returns:
+        :class:`.algebra.Element`: Sum of the elements.
+    """
+    raise NotImplementedError(
+        f"Lazy addition not implemented for "
+        f'"{type(a).__name__}" and "{type(b).__name__}".'
+    )
+
+
+@_dispatch
+def lazy_mul(a, b):
+    """Multiply two elements without simplifying.
+
+    Args:
+        a (:class:`.algebra.Element`): First element in product.
+        b (:class:`.algebra.Element`): Second element in product.
+
+    Returns:
+        :class:`.algebra.Element`: Product of the elements.
+    """
+    raise NotImplementedError(
+        f"Lazy multiplication not implemented for "
+        f'"{type(a).__name__}" and "{type(b).__name__}".'
+    )
+
+
+@_dispatch
+def lazy_power(a, exponent):
+    """Raise an element to a power without simplifying.
+
+    Args:
+        a (:class:`.algebra.Element`): Element to raise to a power.
+        exponent (int): Exponent. Must be positive.
+
+    Returns:
+        :class:`.algebra.Element`: `a` raised to the power `exponent`.
+    """
+    raise NotImplementedError(
+        f'Lazy exponentiation not implemented for "{type(a).__name__}".'
+    )
+
+
+@_dispatch
+def power(a, exponent):
+    """Raise an element to a power.
+
+    Args:
+        a (:class:`.algebra.Element`): Element to raise to a power.
+        exponent (int): Exponent. Must be positive.
+
+    Returns:
+        :class:`.algebra.Element`: `a` raised to the power `exponent`.
+    """
+    raise NotImplementedError(
+        f'Exponentiation not implemented for "{type(a).__name__}".'
+    )
+
+
 @_dispatch
 def get_algebra(a):
     """Get the algebra of an element.
@@ -290,7 +830,16 @@ def get_algebra(a: Element):
     return Element
 
 
-new_cache = {}  #: Cache for `.algebra.new`.
+_get_algebra_cache = MethodCache(get_algebra)  #: Resolved methods of `get_algebra`.
+
+
+def _algebra_method(t):
+    # Determine which method of `get_algebra` applies to a type, as a proxy for
+    # the algebra which the type belongs to.
+    try:
+        return _get_algebra_cache.resolve(t)
+    except LookupError:
+        return None
 
 
 def new(a, t):
@@ -303,39 +852,7 @@ def new(a, t):
     Returns:
         type: Specialisation of `t` appropriate for `a`.
     """
-    try:
-        return new_cache[type(a), t]
-    except KeyError:
-        algebra = get_algebra(a)
-
-        # Determine candidates.
-        algebra_types = set(get_subclasses(algebra))
-        element_types = {t} | set(get_subclasses(t))
-        candidates = list(algebra_types & element_types)
-
-        # Reject concrete parametric types.
-        candidates = [
-            c
-            for c in candidates
-            if not (
-                hasattr(c, "parametric")
-                and c.parametric
-                and hasattr(c, "concrete")
-                and c.concrete
-            )
-        ]
-
-        # The most specific types are the ones we are looking for.
-        candidates = filter_most_specific(candidates)
-
-        # There should only be a single candidate.
-        if len(candidates) != 1:
-            raise RuntimeError(
-                f'Could not determine "{t.__name__}" for algebra "{algebra.__name__}".'
-            )
-
-        new_cache[type(a), t] = candidates[0]
-        return new_cache[type(a), t]
+    return new_cache.lookup(_get_algebra_cache(a), t)
 
 
 def filter_most_specific(types):
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+
+__all__ = ["EvaluationCache"]
+
+
+class EvaluationCache:
+    """Size-bounded cache of values of elements, which evicts the least recently
+    used value first.
+
+    A cache can be given to :func:`.plan.compile_plan`, and can be shared between
+    plans which use the same evaluators. Any object which implements `get` and
+    `put` can be used instead.
+
+    Args:
+        max_size (int, optional): Maximum number of values to cache. Defaults to
+            `1024`.
+
+    Attributes:
+        hits (int): Number of lookups which found a value.
+        misses (int): Number of lookups which did not find a value.
+        evictions (int): Number of values which were evicted.
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, key):
+        """Get a value.
+
+        Args:
+            key (object): Key of the value.
+
+        Returns:
+            object: Value.
+
+        Raises:
+            KeyError: If the value is not in the cache.
+        """
+        try:
+            value = self._values[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self._values.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Put a value in the cache, evicting the least recently used value if the
+        cache is full.
+
+        Args:
+            key (object): Key of the value.
+            value (object): Value.
+        """
+        self._values[key] = value
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_size:
+            self._values.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Clear the cache and reset the statistics."""
+        self._values.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
@@ -1,7 +1,8 @@
-from . import _dispatch
-from .algebra import Element, One, Zero, Wrapped, Join
+from . import _dispatch, algebra
+from .algebra import new, Element, One, Zero, Wrapped, Join
 from .ops.add import Sum
 from .ops.mul import Scaled, Product
+from .ops.power import Power
 
 __all__ = [
     "Function",
@@ -12,18 +13,24 @@ __all__ = [
     "JoinFunction",
     "SumFunction",
     "ProductFunction",
+    "PowerFunction",
     "stretch",
     "shift",
     "select",
     "transform",
     "diff",
     "reverse",
+    "stretch_batch",
+    "shift_batch",
+    "scale_batch",
 ]
 
 
 class Function(Element):
     """A elements."""
 
+    __slots__ = ()
+
     def stretch(self, *stretches):
         """Stretch the elements.
 
@@ -33,6 +40,8 @@ class Function(Element):
         Returns:
             :class:`.elements.Function`: Stretched elements.
         """
+        if algebra._lazy:
+            return _lazy_wrap("stretch", self, *stretches)
         return stretch(self, *stretches)
 
     def shift(self, *amounts):
@@ -44,6 +53,8 @@ class Function(Element):
         Returns:
             :class:`.elements.Function`: Shifted elements.
         """
+        if algebra._lazy:
+            return _lazy_wrap("shift", self, *amounts)
         return shift(self, *amounts)
 
     def select(self, *dims):
@@ -57,6 +68,8 @@ class Function(Element):
             :class:`.elements.Function`: Function with dimensions of the
                 input features selected.
         """
+        if algebra._lazy:
+            return _lazy_wrap("select", self, *dims)
         return select(self, *dims)
 
     def transform(self, *fs):
@@ -70,6 +83,8 @@ class Function(Element):
             :class:`.elements.Function`: Function with its inputs
                 transformed.
         """
+        if algebra._lazy:
+            return _lazy_wrap("transform", self, *fs)
         return transform(self, *fs)
 
     def diff(self, *derivs):
@@ -83,17 +98,63 @@ class Function(Element):
         Returns:
             :class:`.elements.Function`: Derivative of the Function.
         """
+        if algebra._lazy:
+            return _lazy_wrap("diff", self, *derivs)
         return diff(self, *derivs)
 
+    def stretch_batch(self, stretches):
+        """Construct a batch of differently stretched copies of the function.
+
+        Args:
+            stretches (tensor): Batch of stretches. The first dimension indexes the
+                batch.
+
+        Returns:
+            :class:`.elements.Function`: Sum of the stretched copies.
+        """
+        return stretch_batch(self, stretches)
+
+    def shift_batch(self, shifts):
+        """Construct a batch of differently shifted copies of the function.
+
+        Args:
+            shifts (tensor): Batch of shifts. The first dimension indexes the batch.
+
+        Returns:
+            :class:`.elements.Function`: Sum of the shifted copies.
+        """
+        return shift_batch(self, shifts)
+
+    def scale_batch(self, scales):
+        """Construct a batch of differently scaled copies of the function.
+
+        Args:
+            scales (vector): Batch of scales.
+
+        Returns:
+            :class:`.elements.Function`: Sum of the scaled copies.
+        """
+        return scale_batch(self, scales)
+
     def __reversed__(self):
         """Reverse the arguments of a elements.
 
         Returns:
             :class:`.elements.Function`: Function with arguments reversed.
         """
+        if algebra._lazy:
+            return _lazy_wrap("reverse", self)
         return reverse(self)
 
 
+_lazy_wrappers = {}  #: Per operation, type of the wrapper which it constructs.
+
+
+def _lazy_wrap(op, a, *args):
+    # Construct the wrapper directly, without applying any simplification rules.
+    return new(a, _lazy_wrappers[op])(a, *args)
+
+
 # Register the algebra.
 @_dispatch
 def get_algebra(a: Function):
@@ -103,29 +164,49 @@ def get_algebra(a: Function):
 class OneFunction(Function, One):
     """The constant elements `1`."""
 
+    __slots__ = ()
+
 
 class ZeroFunction(Function, Zero):
     """The constant elements `0`."""
 
+    __slots__ = ()
+
 
 class WrappedFunction(Function, Wrapped):
     """A wrapped elements."""
 
+    __slots__ = ()
+
 
 class ScaledFunction(Function, Scaled):
     """A scaled elements."""
 
+    __slots__ = ()
+
 
 class JoinFunction(Function, Join):
-    """Two wrapped functions."""
+    """Joined functions."""
+
+    __slots__ = ()
 
 
 class SumFunction(Function, Sum):
-    """A sum of two functions."""
+    """A sum of functions."""
+
+    __slots__ = ()
 
 
 class ProductFunction(Function, Product):
-    """A product of two functions."""
+    """A product of functions."""
+
+    __slots__ = ()
+
+
+class PowerFunction(Function, Power):
+    """A function raised to a power."""
+
+    __slots__ = ()
 
 
 @_dispatch
@@ -221,3 +302,52 @@ def reverse(a):
     raise NotImplementedError(
         f'Argument reversal not implemented for "{type(a).__name__}".'
     )
+
+
+@_dispatch
+def stretch_batch(a, stretches):
+    """Construct a batch of differently stretched copies of a function.
+
+    Args:
+        a (:class:`.elements.Function`): Function to stretch.
+        stretches (tensor): Batch of stretches. The first dimension indexes the
+            batch.
+
+    Returns:
+        :class:`.elements.Function`: Sum of the stretched copies.
+    """
+    raise NotImplementedError(
+        f'Batched stretching not implemented for "{type(a).__name__}".'
+    )
+
+
+@_dispatch
+def shift_batch(a, shifts):
+    """Construct a batch of differently shifted copies of a function.
+
+    Args:
+        a (:class:`.elements.Function`): Function to shift.
+        shifts (tensor): Batch of shifts. The first dimension indexes the batch.
+
+    Returns:
+        :class:`.elements.Function`: Sum of the shifted copies.
+    """
+    raise NotImplementedError(
+        f'Batched shifting not implemented for "{type(a).__name__}".'
+    )
+
+
+@_dispatch
+def scale_batch(a, scales):
+    """Construct a batch of differently scaled copies of a function.
+
+    Args:
+        a (:class:`.elements.Function`): Function to scale.
+        scales (vector): Batch of scales.
+
+    Returns:
+        :class:`.elements.Function`: Sum of the scaled copies.
+    """
+    raise NotImplementedError(
+        f'Batched scaling not implemented for "{type(a).__name__}".'
+    )
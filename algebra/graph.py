@@ -0,0 +1,121 @@
+from . import _dispatch
+from .algebra import Element, Wrapped, Join
+
+__all__ = ["children", "rebuild", "walk", "cse"]
+
+
+@_dispatch
+def children(e: Element):
+    """Get the child elements of an element.
+
+    Args:
+        e (:class:`.algebra.Element`): Element to get children of.
+
+    Returns:
+        tuple[:class:`.algebra.Element`]: Children of `e`.
+    """
+    return ()
+
+
+@_dispatch
+def children(e: Wrapped):
+    return (e.e,)
+
+
+@_dispatch
+def children(e: Join):
+    return e.es
+
+
+@_dispatch
+def rebuild(e: Element, es):
+    """Construct a copy of an element with its children replaced. If the children
+    are the same, the element itself is returned.
+
+    Args:
+        e (:class:`.algebra.Element`): Element to copy.
+        es (tuple[:class:`.algebra.Element`]): New children.
+
+    Returns:
+        :class:`.algebra.Element`: Copy of `e` with children `es`.
+    """
+    return e
+
+
+@_dispatch
+def rebuild(e: Wrapped, es):
+    if es[0] is e.e:
+        return e
+    copy = _clone(e)
+    copy.e = es[0]
+    return copy
+
+
+@_dispatch
+def rebuild(e: Join, es):
+    if len(es) == len(e.es) and all(x is y for x, y in zip(es, e.es)):
+        return e
+    return type(e)(*es)
+
+
+_uncopied = {"_hash", "_reversed", "__weakref__"}  #: Slots which `_clone` skips.
+
+
+def _clone(e):
+    # Copy the state of the element, except for cached values which depend on the
+    # children.
+    copy = object.__new__(type(e))
+    for c in type(e).__mro__:
+        for name in c.__dict__.get("__slots__", ()):
+            if name not in _uncopied and hasattr(e, name):
+                object.__setattr__(copy, name, getattr(e, name))
+    if hasattr(e, "__dict__"):
+        copy.__dict__.update(e.__dict__)
+    return copy
+
+
+def walk(e):
+    """Walk through all distinct elements in an element. Children are visited
+    before their parents. The walk does not recurse, so deep elements can be walked.
+
+    Args:
+        e (:class:`.algebra.Element`): Element to walk through.
+
+    Returns:
+        iterator: Iterator over the elements in `e`.
+    """
+    visited = set()
+    stack = [(e, False)]
+    while stack:
+        e, expanded = stack.pop()
+        if expanded:
+            yield e
+        elif id(e) not in visited:
+            visited.add(id(e))
+            stack.append((e, True))
+            stack.extend((c, False) for c in reversed(children(e)))
+
+
+def cse(e):
+    """Eliminate common subexpressions: rewrite an element such that equal
+    subexpressions are the same object.
+
+    Args:
+        e (:class:`.algebra.Element`): Element to rewrite.
+
+    Returns:
+        tuple[:class:`.algebra.Element`, int]: Rewritten element and the number of
+            elements which were saved.
+    """
+    # Map every element to its replacement. Canonical elements are indexed by
+    # themselves, which relies on the hashes of elements being consistent with
+    # equality.
+    replacements = {}
+    canonical = {}
+    before = 0
+    for x in walk(e):
+        before += 1
+        x_new = rebuild(x, tuple(replacements[id(c)] for c in children(x)))
+        replacements[id(x)] = canonical.setdefault(x_new, x_new)
+    e_new = replacements[id(e)]
+    return e_new, before - sum(1 for _ in walk(e_new))
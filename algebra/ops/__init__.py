@@ -1,9 +1,14 @@
 from .add import *
+from .batch import *
 from .diff import *
+from .expand import *
 from .mul import *
+from .normalise import *
+from .power import *
 from .reverse import *
 from .select import *
 from .shift import *
+from .simplify import *
 from .stretch import *
 from .tensor import *
 from .transform import *
@@ -1,34 +1,59 @@
-from .mul import mul, Scaled
+from .mul import mul, lazy_mul, Scaled, Product
 from .. import _dispatch
-from ..algebra import proven, new, Element, Zero, One, Join
-from ..util import identical
+from ..algebra import proven, new, flatten, Element, Zero, One, Join
+from ..graph import children
+from ..util import identical, unordered_equal
 
-__all__ = ["Sum"]
+__all__ = ["Sum", "collect", "SumBuilder", "factorise"]
 
 
 class Sum(Join):
-    """Sum of elements."""
+    """Sum of elements.
+
+    Nested sums are flattened, so a sum stores its terms as a flat tuple.
+
+    Args:
+        *es (:class:`.algebra.Element`): Terms of the sum.
+    """
+
+    __slots__ = ("_num_terms", "_terms")
+
+    def __init__(self, *es):
+        Join.__init__(self, *flatten(es, Sum))
+        # Nested sums already know their number of terms, so this is cheap.
+        self._num_terms = sum(e.num_terms for e in es)
+        self._terms = None
 
     @property
     def num_terms(self):
-        return self[0].num_terms + self[1].num_terms
+        return self._num_terms
+
+    def _term_table(self):
+        if self._terms is None:
+            self._terms = tuple(t for e in self.es for t in e.terms())
+        return self._terms
 
     def term(self, i):
-        if i >= self.num_terms:
+        if not 0 <= i < self._num_terms:
             raise IndexError("Index out of range.")
-        if i < self[0].num_terms:
-            return self[0].term(i)
-        else:
-            return self[1].term(i - self[0].num_terms)
+        return self._term_table()[i]
+
+    def terms(self):
+        return iter(self._term_table())
 
     def render_join(self, e1, e2, formatter):
         return f"{e1} + {e2}"
 
     @_dispatch
     def __eq__(self, other: "Sum"):
-        way1 = self[0] == other[0] and self[1] == other[1]
-        way2 = self[0] == other[1] and self[1] == other[0]
-        return way1 or way2
+        # The hash canonicalises the order of the terms, so use it to quickly reject.
+        if self is other:
+            return True
+        return hash(self) == hash(other) and unordered_equal(self.es, other.es)
+
+    def structural_hash(self):
+        # Addition is commutative, so the hash should not depend on the order.
+        return hash((Sum, tuple(sorted(hash(e) for e in self.es))))
 
 
 # Generic addition.
@@ -58,6 +83,24 @@ def add(a: Element, b: Element):
         return new(a, Sum)(a, b)
 
 
+# Lazy addition.
+
+
+@_dispatch
+def lazy_add(a: Element, b):
+    return new(a, Sum)(a, lazy_mul(b, new(a, One)()))
+
+
+@_dispatch
+def lazy_add(a, b: Element):
+    return new(b, Sum)(lazy_mul(a, new(b, One)()), b)
+
+
+@_dispatch
+def lazy_add(a: Element, b: Element):
+    return new(a, Sum)(a, b)
+
+
 # Cancel redundant zeros and ones.
 
 
@@ -117,3 +160,211 @@ def add(a: Scaled, b: Scaled):
         return mul(a.scale + b.scale, a[0])
     else:
         return new(a, Sum)(a, b)
+
+
+# Collect like terms across a whole sum.
+
+
+@_dispatch
+def collect(a: Element):
+    """Collect like terms in a sum. Terms are like if they are equal up to a scale,
+    and like terms are combined by adding their scales.
+
+    Args:
+        a (:class:`.algebra.Element`): Element to collect like terms of.
+
+    Returns:
+        :class:`.algebra.Element`: `a` with like terms collected.
+    """
+    return a
+
+
+@_dispatch
+def collect(a: Sum):
+    # Iterate over the joined elements rather than the terms, because elements like
+    # batches would be unrolled into their terms.
+    builder = SumBuilder(a)
+    for e in a.es:
+        builder.append(e)
+    return builder.build()
+
+
+class SumBuilder:
+    """Build a sum by appending terms one at a time. Like terms are combined upon
+    appending, which takes amortised constant time, rather than time linear in the
+    number of terms of the sum.
+
+    Args:
+        template (:class:`.algebra.Element`, optional): Element which determines
+            the algebra of the sum. Defaults to the first element which is appended.
+    """
+
+    def __init__(self, template=None):
+        self._template = template
+        # Index the terms by their unscaled part. This relies on the hashes of
+        # elements being consistent with equality.
+        self._index = {}
+        self._bases = []
+        self._scales = []
+        self._constant = 0
+
+    def __len__(self):
+        return len(self._bases)
+
+    def __iadd__(self, term):
+        self.append(term)
+        return self
+
+    def append(self, term):
+        """Append a term.
+
+        Args:
+            term (:class:`.algebra.Element` or tensor): Term to append. If the term
+                is a sum, its terms are appended.
+        """
+        if not isinstance(term, Element):
+            self._constant = self._constant + term
+            return
+        if self._template is None:
+            self._template = term
+        if isinstance(term, Sum):
+            for e in term.es:
+                self.append(e)
+            return
+        if isinstance(term, Zero):
+            return
+        if isinstance(term, Scaled):
+            base, scale = term[0], term.scale
+        else:
+            base, scale = term, 1
+        try:
+            i = self._index[base]
+            self._scales[i] = self._scales[i] + scale
+        except KeyError:
+            self._index[base] = len(self._bases)
+            self._bases.append(base)
+            self._scales.append(scale)
+
+    def build(self):
+        """Construct the sum. Terms which cancelled are discarded.
+
+        Returns:
+            :class:`.algebra.Element`: Sum of the appended terms. If no elements
+                were appended and no template was given, the sum of the appended
+                numbers is returned instead.
+        """
+        if self._template is None:
+            return self._constant
+        bases, scales = list(self._bases), list(self._scales)
+        if not identical(self._constant, 0):
+            # Combine the numbers with a term which is one, if there is one.
+            one = new(self._template, One)()
+            try:
+                i = self._index[one]
+                scales[i] = scales[i] + self._constant
+            except KeyError:
+                bases.append(one)
+                scales.append(self._constant)
+        terms = [mul(scale, base) for base, scale in zip(bases, scales)]
+        terms = [term for term in terms if not isinstance(term, Zero)]
+        if len(terms) == 0:
+            return new(self._template, Zero)()
+        elif len(terms) == 1:
+            return terms[0]
+        else:
+            return new(self._template, Sum)(*terms)
+
+
+# Pull common factors out of sums.
+
+
+@_dispatch
+def factorise(a: Element):
+    """Pull common factors out of the terms of a sum, e.g. rewrite `a * b + a * c`
+    to `a * (b + c)`. A factor is only pulled out if that reduces the number of
+    evaluations of leaves, and factors which save the most evaluations are pulled
+    out first.
+
+    Args:
+        a (:class:`.algebra.Element`): Element to factorise.
+
+    Returns:
+        :class:`.algebra.Element`: `a` with common factors pulled out.
+    """
+    return a
+
+
+@_dispatch
+def factorise(a: Sum):
+    return _factorise(a, [_split(term) for term in a.es])
+
+
+def _split(a):
+    # Split a term into a scale and a tuple of factors.
+    scale = 1
+    if isinstance(a, Scaled):
+        scale, a = a.scale, a[0]
+    if isinstance(a, Product):
+        return scale, a.es
+    else:
+        return scale, (a,)
+
+
+def _join(a, scale, factors):
+    # Inverse of `_split`.
+    if len(factors) == 0:
+        e = new(a, One)()
+    elif len(factors) == 1:
+        e = factors[0]
+    else:
+        e = new(a, Product)(*factors)
+    return mul(scale, e)
+
+
+def _factorise(a, terms):
+    # Find the factor which saves the most evaluations of leaves. Like in `collect`,
+    # this relies on the hashes of elements being consistent with equality.
+    occurrences = {}
+    for i, (_, factors) in enumerate(terms):
+        for factor in factors:
+            occurrences.setdefault(factor, [])
+            if not occurrences[factor] or occurrences[factor][-1] != i:
+                occurrences[factor].append(i)
+    best, best_saving = None, 0
+    for factor, indices in occurrences.items():
+        saving = (len(indices) - 1) * _cost(factor)
+        if saving > best_saving:
+            best, best_saving = factor, saving
+
+    if best is None:
+        # Nothing can be pulled out.
+        terms = [_join(a, scale, factors) for scale, factors in terms]
+        return terms[0] if len(terms) == 1 else new(a, Sum)(*terms)
+
+    # Pull out the factor and factorise what remains.
+    common, rest = [], []
+    for scale, factors in terms:
+        if best in factors:
+            factors = list(factors)
+            factors.remove(best)
+            common.append((scale, tuple(factors)))
+        else:
+            rest.append((scale, factors))
+    common = mul(best, _factorise(a, common))
+    if len(rest) == 0:
+        return common
+    return _factorise(a, rest + [(1, (common,))])
+
+
+def _cost(a):
+    # Count the number of leaves which need to be evaluated to evaluate `a`.
+    cost = 0
+    stack = [a]
+    while stack:
+        a = stack.pop()
+        es = children(a)
+        if es:
+            stack.extend(es)
+        elif not isinstance(a, (Zero, One)):
+            cost += 1
+    return cost
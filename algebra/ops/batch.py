@@ -0,0 +1,312 @@
+import lab as B
+
+from .add import Sum
+from .shift import ShiftedFunction
+from .stretch import StretchedFunction
+from .. import _dispatch
+from ..algebra import proven, new, add, mul
+from ..function import (
+    Function,
+    OneFunction,
+    ZeroFunction,
+    WrappedFunction,
+    stretch,
+    shift,
+    stretch_batch,
+    shift_batch,
+    scale_batch,
+)
+from ..util import to_tensor, identical, fingerprint
+
+__all__ = ["BatchedFunction"]
+
+
+class BatchedFunction(WrappedFunction):
+    """Sum of a batch of scaled, stretched, and shifted copies of a function.
+
+    The `i`th term of the sum is `scales[i] * (e > stretches[i]) shift shifts[i]`.
+    The parameters are stored as stacked tensors, so the batch is a single element
+    regardless of its size.
+
+    Args:
+        e (:class:`.elements.Function`): Function to batch.
+        scales (vector): Batch of scales.
+        stretches (tensor): Batch of stretches. The first dimension indexes the
+            batch.
+        shifts (tensor): Batch of shifts. The first dimension indexes the batch.
+    """
+
+    __slots__ = ("scales", "stretches", "shifts")
+
+    def __init__(self, e, scales, stretches, shifts):
+        WrappedFunction.__init__(self, e)
+        self.scales = to_tensor(scales)
+        self.stretches = to_tensor(stretches)
+        self.shifts = to_tensor(shifts)
+        sizes = {_batch_size(x) for x in (self.scales, self.stretches, self.shifts)}
+        if len(sizes) != 1:
+            raise ValueError("Parameters of the batch must have equal batch sizes.")
+
+    @property
+    def batch_size(self):
+        """int: Number of copies in the batch."""
+        return _batch_size(self.scales)
+
+    @property
+    def num_terms(self):
+        return self.batch_size * self[0].num_terms
+
+    def term(self, i):
+        if not 0 <= i < self.num_terms:
+            raise IndexError("Index out of range.")
+        i_batch, i_term = divmod(i, self[0].num_terms)
+        return self._copy(i_batch, self[0].term(i_term))
+
+    def terms(self):
+        for i in range(self.batch_size):
+            for term in self[0].terms():
+                yield self._copy(i, term)
+
+    def _copy(self, i, e):
+        # Omit stretches by one and shifts by zero.
+        if not _all(self.stretches[i], 1):
+            e = stretch(e, self.stretches[i])
+        if not _all(self.shifts[i], 0):
+            e = shift(e, self.shifts[i])
+        return mul(self.scales[i], e)
+
+    def render_wrap(self, e, formatter):
+        return (
+            f"Batched({e}, "
+            f"scales={formatter(self.scales)}, "
+            f"stretches={formatter(self.stretches)}, "
+            f"shifts={formatter(self.shifts)})"
+        )
+
+    @_dispatch
+    def __eq__(self, other: "BatchedFunction"):
+        return (
+            self[0] == other[0]
+            and identical(self.scales, other.scales)
+            and identical(self.stretches, other.stretches)
+            and identical(self.shifts, other.shifts)
+        )
+
+    def structural_hash(self):
+        return hash(
+            (
+                BatchedFunction,
+                hash(self[0]),
+                fingerprint(self.scales),
+                fingerprint(self.stretches),
+                fingerprint(self.shifts),
+            )
+        )
+
+
+def _batch_size(x):
+    return B.shape(x)[0]
+
+
+def _all(x, value):
+    return bool(B.all(x == value))
+
+
+# A batched function will never need parentheses.
+
+
+@_dispatch(precedence=proven())
+def need_parens(el: Function, parent: BatchedFunction):
+    return False
+
+
+@_dispatch(precedence=proven())
+def need_parens(el: BatchedFunction, parent: Function):
+    return False
+
+
+# Construct batches.
+
+
+def _batch(a, scales=None, stretches=None, shifts=None):
+    # Fill in the parameters which are not given.
+    ref = next(x for x in (scales, stretches, shifts) if x is not None)
+    ref = to_tensor(ref)
+    batch_size = _batch_size(ref)
+    if scales is None:
+        scales = B.ones(B.dtype(ref), batch_size)
+    if stretches is None:
+        stretches = B.ones(B.dtype(ref), batch_size)
+    if shifts is None:
+        shifts = B.zeros(B.dtype(ref), batch_size)
+    return new(a, BatchedFunction)(a, scales, stretches, shifts)
+
+
+@_dispatch
+def stretch_batch(a: Function, stretches):
+    return _batch(a, stretches=stretches)
+
+
+@_dispatch
+def shift_batch(a: Function, shifts):
+    return _batch(a, shifts=shifts)
+
+
+@_dispatch
+def scale_batch(a: Function, scales):
+    return _batch(a, scales=scales)
+
+
+@_dispatch(precedence=proven())
+def stretch_batch(a: ZeroFunction, stretches):
+    return a
+
+
+@_dispatch(precedence=proven())
+def shift_batch(a: ZeroFunction, shifts):
+    return a
+
+
+@_dispatch(precedence=proven())
+def scale_batch(a: ZeroFunction, scales):
+    return a
+
+
+# Stretching or shifting a constant does nothing, so a batch of ones is a multiple of
+# one.
+
+
+@_dispatch(precedence=proven())
+def stretch_batch(a: OneFunction, stretches):
+    return mul(_batch_size(to_tensor(stretches)), a)
+
+
+@_dispatch(precedence=proven())
+def shift_batch(a: OneFunction, shifts):
+    return mul(_batch_size(to_tensor(shifts)), a)
+
+
+@_dispatch(precedence=proven())
+def scale_batch(a: OneFunction, scales):
+    return mul(B.sum(to_tensor(scales)), a)
+
+
+# Batching a batch gives every combination of the two batches. Note that
+# `((e > a) shift b) > c = (e > a * c) shift (b * c)`.
+
+
+def _outer(a, x):
+    # Pair every copy in the batch `a` with every element of the batch `x`. The
+    # batch of `x` varies fastest.
+    size_a, size_x = a.batch_size, _batch_size(x)
+    i = [i for i in range(size_a) for _ in range(size_x)]
+    j = list(range(size_x)) * size_a
+    return (
+        B.take(a.scales, i, axis=0),
+        B.take(a.stretches, i, axis=0),
+        B.take(a.shifts, i, axis=0),
+        B.take(x, j, axis=0),
+    )
+
+
+def _align(x, y):
+    # Let parameters of different ranks broadcast along the trailing dimensions.
+    x = B.reshape(x, *B.shape(x), *((1,) * (B.rank(y) - B.rank(x))))
+    y = B.reshape(y, *B.shape(y), *((1,) * (B.rank(x) - B.rank(y))))
+    return x, y
+
+
+@_dispatch
+def stretch_batch(a: BatchedFunction, stretches):
+    scales, a_stretches, shifts, stretches = _outer(a, to_tensor(stretches))
+    return new(a, BatchedFunction)(
+        a[0],
+        scales,
+        B.multiply(*_align(a_stretches, stretches)),
+        B.multiply(*_align(shifts, stretches)),
+    )
+
+
+@_dispatch
+def shift_batch(a: BatchedFunction, shifts):
+    scales, stretches, a_shifts, shifts = _outer(a, to_tensor(shifts))
+    return new(a, BatchedFunction)(
+        a[0], scales, stretches, B.add(*_align(a_shifts, shifts))
+    )
+
+
+@_dispatch
+def scale_batch(a: BatchedFunction, scales):
+    a_scales, stretches, shifts, scales = _outer(a, to_tensor(scales))
+    return new(a, BatchedFunction)(a[0], a_scales * scales, stretches, shifts)
+
+
+def _for_all_copies(x):
+    # Give a parameter which applies to all copies a batch dimension of size one.
+    x = to_tensor(x)
+    return B.reshape(x, 1, *B.shape(x))
+
+
+@_dispatch
+def stretch(a: BatchedFunction, *stretches):
+    if len(stretches) != 1:
+        return new(a, StretchedFunction)(a, *stretches)
+    stretches = _for_all_copies(stretches[0])
+    return new(a, BatchedFunction)(
+        a[0],
+        a.scales,
+        B.multiply(*_align(a.stretches, stretches)),
+        B.multiply(*_align(a.shifts, stretches)),
+    )
+
+
+@_dispatch
+def shift(a: BatchedFunction, *shifts):
+    if len(shifts) != 1:
+        return new(a, ShiftedFunction)(a, *shifts)
+    shifts = _for_all_copies(shifts[0])
+    return new(a, BatchedFunction)(
+        a[0], a.scales, a.stretches, B.add(*_align(a.shifts, shifts))
+    )
+
+
+@_dispatch
+def mul(a: B.Number, b: BatchedFunction):
+    return mul(b, a)
+
+
+@_dispatch
+def mul(a: BatchedFunction, b: B.Number):
+    if identical(b, 0):
+        return new(a, ZeroFunction)()
+    elif identical(b, 1):
+        return a
+    else:
+        return new(a, BatchedFunction)(a[0], a.scales * b, a.stretches, a.shifts)
+
+
+# Batches of the same function can be concatenated.
+
+
+def _concatenable(a, b):
+    return all(
+        B.shape(x)[1:] == B.shape(y)[1:]
+        for x, y in [
+            (a.scales, b.scales),
+            (a.stretches, b.stretches),
+            (a.shifts, b.shifts),
+        ]
+    )
+
+
+@_dispatch
+def add(a: BatchedFunction, b: BatchedFunction):
+    if a[0] == b[0] and _concatenable(a, b):
+        return new(a, BatchedFunction)(
+            a[0],
+            B.concat(a.scales, b.scales, axis=0),
+            B.concat(a.stretches, b.stretches, axis=0),
+            B.concat(a.shifts, b.shifts, axis=0),
+        )
+    else:
+        return new(a, Sum)(a, b)
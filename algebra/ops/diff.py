@@ -4,9 +4,10 @@ from ..function import (
     OneFunction,
     ZeroFunction,
     WrappedFunction,
+    _lazy_wrappers,
 )
 from ..algebra import proven, new
-from ..util import identical
+from ..util import identical, fingerprint
 
 __all__ = ["DerivativeFunction"]
 
@@ -21,6 +22,8 @@ class DerivativeFunction(WrappedFunction):
             take the derivative of. Set to `None` to not take a derivative.
     """
 
+    __slots__ = ("derivs",)
+
     def __init__(self, e, *derivs):
         WrappedFunction.__init__(self, e)
         self.derivs = derivs
@@ -36,6 +39,12 @@ class DerivativeFunction(WrappedFunction):
     def __eq__(self, other: "DerivativeFunction"):
         return self[0] == other[0] and identical(self.derivs, other.derivs)
 
+    def structural_hash(self):
+        return hash((DerivativeFunction, hash(self[0]), fingerprint(self.derivs)))
+
+
+_lazy_wrappers["diff"] = DerivativeFunction
+
 
 @_dispatch
 def diff(a: Function, *derivs):
@@ -0,0 +1,191 @@
+from .add import Sum, SumBuilder
+from .diff import DerivativeFunction
+from .mul import Scaled, Product, ProductBuilder
+from .power import Power
+from .reverse import ReversedFunction
+from .select import SelectedFunction
+from .shift import ShiftedFunction
+from .stretch import StretchedFunction
+from .transform import InputTransformedFunction
+from .. import _dispatch
+from ..algebra import new, Element, Zero, mul, power
+from ..function import stretch, shift, select, transform, diff, reverse
+from ..graph import children, rebuild, walk
+
+__all__ = ["expand"]
+
+
+def expand(a):
+    """Expand an element into a sum of products by distributing products over sums.
+    Wrappers which are linear, like scaling, stretching, and shifting, are pushed
+    through sums.
+
+    The expansion is canonical: like terms are collected, and repeated factors are
+    represented as powers. Hence, expansions of equal polynomials are equal.
+
+    Every distinct subexpression is expanded only once, and the expansion does not
+    recurse, so deep elements can be expanded.
+
+    Args:
+        a (:class:`.algebra.Element`): Element to expand.
+
+    Returns:
+        :class:`.algebra.Element`: Expansion of `a`.
+    """
+    # Expand every element into a tuple of terms. Children are visited before their
+    # parents, so the expansions of the children are available. Collect the terms
+    # for every element, so the number of terms does not blow up.
+    expansions = {}
+    for e in walk(a):
+        terms = _expand(e, tuple(expansions[id(c)] for c in children(e)))
+        expansions[id(e)] = _collect(e, terms)
+    return _sum(a, expansions[id(a)])
+
+
+def _collect(a, terms):
+    builder = SumBuilder(a)
+    for term in terms:
+        builder.append(_monomial(term))
+    result = builder.build()
+    if isinstance(result, Sum):
+        return result.es
+    elif isinstance(result, Zero):
+        return ()
+    else:
+        return (result,)
+
+
+def _monomial(a):
+    # Write a product as a scale times a product of powers of distinct factors.
+    scale = 1
+    powers = {}
+    stack = [(a, 1)]
+    while stack:
+        e, n = stack.pop()
+        if isinstance(e, Product):
+            stack.extend((x, n) for x in reversed(e.es))
+        elif isinstance(e, Power):
+            stack.append((e[0], n * e.exponent))
+        elif isinstance(e, Scaled):
+            scale = scale * e.scale ** n
+            stack.append((e[0], n))
+        else:
+            powers[e] = powers.get(e, 0) + n
+    builder = ProductBuilder(a)
+    builder.append(scale)
+    for e, n in powers.items():
+        builder.append(power(e, n))
+    return builder.build()
+
+
+def _multiply(a, terms1, terms2):
+    # Collect after every multiplication, so intermediate expansions stay as small
+    # as possible.
+    return _collect(a, tuple(mul(t1, t2) for t1 in terms1 for t2 in terms2))
+
+
+def _sum(a, terms):
+    if len(terms) == 0:
+        return new(a, Zero)()
+    elif len(terms) == 1:
+        return terms[0]
+    else:
+        return new(a, Sum)(*terms)
+
+
+@_dispatch
+def _expand(a: Element, expansions):
+    """Expand an element into terms.
+
+    Args:
+        a (:class:`.algebra.Element`): Element to expand.
+        expansions (tuple[tuple[:class:`.algebra.Element`]]): Per child of `a`, the
+            terms of the expansion of the child.
+
+    Returns:
+        tuple[:class:`.algebra.Element`]: Terms of the expansion of `a`.
+    """
+    # Elements which cannot be expanded still get expanded children.
+    return (rebuild(a, tuple(_sum(a, terms) for terms in expansions)),)
+
+
+@_dispatch
+def _expand(a: Sum, expansions):
+    return tuple(t for terms in expansions for t in terms)
+
+
+@_dispatch
+def _expand(a: Product, expansions):
+    # Multiply the factors pairwise rather than forming all combinations of terms.
+    result = expansions[0]
+    for terms in expansions[1:]:
+        result = _multiply(a, result, terms)
+    return result
+
+
+@_dispatch
+def _expand(a: Power, expansions):
+    (terms,) = expansions
+    if len(terms) == 1:
+        return (power(terms[0], a.exponent),)
+    # Use repeated squaring, which takes a logarithmic number of multiplications.
+    result, exponent = None, a.exponent
+    while exponent > 0:
+        if exponent % 2 == 1:
+            result = terms if result is None else _multiply(a, result, terms)
+        exponent //= 2
+        if exponent > 0:
+            terms = _multiply(a, terms, terms)
+    return result
+
+
+@_dispatch
+def _expand(a: Scaled, expansions):
+    (terms,) = expansions
+    return tuple(mul(a.scale, t) for t in terms)
+
+
+# Push linear wrappers through sums.
+
+
+def _linear(op, terms):
+    # Also pull scales out of the wrappers, so expansions are canonical.
+    return tuple(
+        mul(t.scale, op(t[0])) if isinstance(t, Scaled) else op(t) for t in terms
+    )
+
+
+@_dispatch
+def _expand(a: StretchedFunction, expansions):
+    (terms,) = expansions
+    return _linear(lambda x: stretch(x, *a.stretches), terms)
+
+
+@_dispatch
+def _expand(a: ShiftedFunction, expansions):
+    (terms,) = expansions
+    return _linear(lambda x: shift(x, *a.shifts), terms)
+
+
+@_dispatch
+def _expand(a: SelectedFunction, expansions):
+    (terms,) = expansions
+    return _linear(lambda x: select(x, *a.dims), terms)
+
+
+@_dispatch
+def _expand(a: InputTransformedFunction, expansions):
+    (terms,) = expansions
+    return _linear(lambda x: transform(x, *a.fs), terms)
+
+
+@_dispatch
+def _expand(a: DerivativeFunction, expansions):
+    (terms,) = expansions
+    return _linear(lambda x: diff(x, *a.derivs), terms)
+
+
+@_dispatch
+def _expand(a: ReversedFunction, expansions):
+    (terms,) = expansions
+    return _linear(lambda x: reverse(x), terms)
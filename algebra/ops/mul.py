@@ -1,8 +1,8 @@
 from .. import _dispatch
-from ..algebra import proven, new, Element, Zero, One, Wrapped, Join
-from ..util import identical
+from ..algebra import proven, new, flatten, Element, Zero, One, Wrapped, Join, power
+from ..util import identical, fingerprint, unordered_equal
 
-__all__ = ["Scaled", "Product"]
+__all__ = ["Scaled", "Product", "ProductBuilder"]
 
 
 class Scaled(Wrapped):
@@ -13,6 +13,8 @@ class Scaled(Wrapped):
         scale (tensor): Scale.
     """
 
+    __slots__ = ("scale",)
+
     def __init__(self, e, scale):
         Wrapped.__init__(self, e)
         self.scale = scale
@@ -30,34 +32,65 @@ class Scaled(Wrapped):
         else:
             return self.scale if i == 0 else self[0].factor(i - 1)
 
+    def factors(self):
+        yield self.scale
+        yield from self[0].factors()
+
     @_dispatch
     def __eq__(self, other: "Scaled"):
         return self[0] == other[0] and identical(self.scale, other.scale)
 
+    def structural_hash(self):
+        return hash((Scaled, hash(self[0]), fingerprint(self.scale)))
+
 
 class Product(Join):
-    """Product of elements."""
+    """Product of elements.
+
+    Nested products are flattened, so a product stores its factors as a flat tuple.
+
+    Args:
+        *es (:class:`.algebra.Element`): Factors of the product.
+    """
+
+    __slots__ = ("_num_factors", "_factors")
+
+    def __init__(self, *es):
+        Join.__init__(self, *flatten(es, Product))
+        # Nested products already know their number of factors, so this is cheap.
+        self._num_factors = sum(e.num_factors for e in es)
+        self._factors = None
 
     @property
     def num_factors(self):
-        return self[0].num_factors + self[1].num_factors
+        return self._num_factors
+
+    def _factor_table(self):
+        if self._factors is None:
+            self._factors = tuple(f for e in self.es for f in e.factors())
+        return self._factors
 
     def factor(self, i):
-        if i >= self.num_factors:
+        if not 0 <= i < self._num_factors:
             raise IndexError("Index out of range.")
-        if i < self[0].num_factors:
-            return self[0].factor(i)
-        else:
-            return self[1].factor(i - self[0].num_factors)
+        return self._factor_table()[i]
+
+    def factors(self):
+        return iter(self._factor_table())
 
     def render_join(self, e1, e2, formatter):
         return f"{e1} * {e2}"
 
     @_dispatch
     def __eq__(self, other: "Product"):
-        way1 = self[0] == other[0] and self[1] == other[1]
-        way2 = self[0] == other[1] and self[1] == other[0]
-        return way1 or way2
+        # The hash canonicalises the order of the factors, so use it to quickly reject.
+        if self is other:
+            return True
+        return hash(self) == hash(other) and unordered_equal(self.es, other.es)
+
+    def structural_hash(self):
+        # Multiplication is commutative, so the hash should not depend on the order.
+        return hash((Product, tuple(sorted(hash(e) for e in self.es))))
 
 
 # Generic multiplication.
@@ -80,6 +113,27 @@ def mul(a, b: Element):
 
 @_dispatch
 def mul(a: Element, b: Element):
+    builder = ProductBuilder(a)
+    builder.append(a)
+    builder.append(b)
+    return builder.build()
+
+
+# Lazy multiplication.
+
+
+@_dispatch
+def lazy_mul(a: Element, b):
+    return new(a, Scaled)(a, b)
+
+
+@_dispatch
+def lazy_mul(a, b: Element):
+    return lazy_mul(b, a)
+
+
+@_dispatch
+def lazy_mul(a: Element, b: Element):
     return new(a, Product)(a, b)
 
 
@@ -142,3 +196,101 @@ def mul(a: Element, b: Scaled):
 @_dispatch
 def mul(a: Scaled, b: Scaled):
     return new(a, Scaled)(mul(a[0], b[0]), a.scale * b.scale)
+
+
+class ProductBuilder:
+    """Build a product by appending factors one at a time. Equal factors and powers
+    of equal factors are combined into a single power upon appending, which takes
+    amortised constant time, rather than time linear in the number of factors of
+    the product.
+
+    Args:
+        template (:class:`.algebra.Element`, optional): Element which determines
+            the algebra of the product. Defaults to the first element which is
+            appended.
+    """
+
+    def __init__(self, template=None):
+        self._template = template
+        # Index the factors by their base. This relies on the hashes of elements
+        # being consistent with equality.
+        self._index = {}
+        self._bases = []
+        self._exponents = []
+        self._scale = 1
+        self._zero = False
+
+    def __len__(self):
+        return len(self._bases)
+
+    def __imul__(self, factor):
+        self.append(factor)
+        return self
+
+    def append(self, factor):
+        """Append a factor.
+
+        Args:
+            factor (:class:`.algebra.Element` or tensor): Factor to append. If the
+                factor is a product, its factors are appended.
+        """
+        if not isinstance(factor, Element):
+            self._scale = self._scale * factor
+            return
+        if self._template is None:
+            self._template = factor
+        if isinstance(factor, Product):
+            for e in factor.es:
+                self.append(e)
+            return
+        if isinstance(factor, Scaled):
+            self._scale = self._scale * factor.scale
+            self.append(factor[0])
+            return
+        if isinstance(factor, Zero):
+            self._zero = True
+            return
+        if isinstance(factor, One):
+            return
+        base, exponent = _split_power(factor)
+        try:
+            i = self._index[base]
+            self._exponents[i] = self._exponents[i] + exponent
+        except KeyError:
+            self._index[base] = len(self._bases)
+            self._bases.append(base)
+            self._exponents.append(exponent)
+
+    def build(self):
+        """Construct the product.
+
+        Returns:
+            :class:`.algebra.Element`: Product of the appended factors. If no
+                elements were appended and no template was given, the product of the
+                appended numbers is returned instead.
+        """
+        if self._template is None:
+            return self._scale
+        if self._zero:
+            return new(self._template, Zero)()
+        factors = [power(base, n) for base, n in zip(self._bases, self._exponents)]
+        if len(factors) == 0:
+            product = new(self._template, One)()
+        elif len(factors) == 1:
+            product = factors[0]
+        else:
+            product = new(self._template, Product)(*factors)
+        return mul(self._scale, product)
+
+
+@_dispatch
+def _split_power(a: Element):
+    """Split an element into a base and an exponent.
+
+    Args:
+        a (:class:`.algebra.Element`): Element to split.
+
+    Returns:
+        tuple[:class:`.algebra.Element`, int]: Base and exponent.
+    """
+    return a, 1
@@ -0,0 +1,133 @@
+import operator
+
+from .select import SelectedFunction
+from .shift import ShiftedFunction
+from .stretch import StretchedFunction
+from .transform import InputTransformedFunction
+from .. import _dispatch
+from ..algebra import Element
+from ..function import stretch, shift, select, transform
+from ..graph import children, rebuild, walk
+from ..util import broadcast, identical, fingerprint
+
+__all__ = ["normalise"]
+
+
+def normalise(a):
+    """Normalise the wrappers which transform the inputs of functions, so every
+    function sees as few transformations of its inputs as possible. Consecutive
+    selections are fused into one selection, consecutive input transforms are
+    composed into one transform, and stretches and shifts are fused into a single
+    stretch followed by a single shift.
+
+    Args:
+        a (:class:`.algebra.Element`): Element to normalise.
+
+    Returns:
+        :class:`.algebra.Element`: Normalised element.
+    """
+    # Children are visited before their parents, so they are already normalised.
+    normalised = {}
+    for e in walk(a):
+        e_new = rebuild(e, tuple(normalised[id(c)] for c in children(e)))
+        normalised[id(e)] = _normalise(e_new)
+    return normalised[id(a)]
+
+
+@_dispatch
+def _normalise(a: Element):
+    """Normalise an element whose children are already normalised.
+
+    Args:
+        a (:class:`.algebra.Element`): Element to normalise.
+
+    Returns:
+        :class:`.algebra.Element`: Normalised element.
+    """
+    return a
+
+
+@_dispatch
+def _normalise(a: ShiftedFunction):
+    # Fold consecutive shifts.
+    return shift(a[0], *a.shifts)
+
+
+@_dispatch
+def _normalise(a: StretchedFunction):
+    e = a[0]
+    if isinstance(e, ShiftedFunction):
+        # Commute the stretch past the shift:
+        # `(e > s1) shift s2) > s3 = (e > (s1 * s3)) shift (s2 * s3)`.
+        shifts = broadcast(operator.mul, e.shifts, a.stretches)
+        return shift(stretch(e[0], *a.stretches), *shifts)
+    else:
+        # Fold consecutive stretches.
+        return stretch(e, *a.stretches)
+
+
+@_dispatch
+def _normalise(a: SelectedFunction):
+    e = a[0]
+    if isinstance(e, SelectedFunction):
+        # The outer selection is applied first.
+        return select(e[0], *broadcast(_fuse_dims, e.dims, a.dims))
+    else:
+        return a
+
+
+def _fuse_dims(inner, outer):
+    if inner is None:
+        return outer
+    elif outer is None:
+        return inner
+    else:
+        return [outer[i] for i in inner]
+
+
+@_dispatch
+def _normalise(a: InputTransformedFunction):
+    e = a[0]
+    if isinstance(e, InputTransformedFunction):
+        # The outer transform is applied first.
+        return transform(e[0], *broadcast(_compose, e.fs, a.fs))
+    else:
+        return a
+
+
+def _compose(inner, outer):
+    if inner is None:
+        return outer
+    elif outer is None:
+        return inner
+    else:
+        return _Composition(inner, outer)
+
+
+class _Composition:
+    """Composition `f(g(x))` of two functions.
+
+    Args:
+        f (function): Function to apply second.
+        g (function): Function to apply first.
+    """
+
+    __slots__ = ("f", "g", "__name__")
+
+    def __init__(self, f, g):
+        self.f = f
+        self.g = g
+        self.__name__ = f"{f.__name__} o {g.__name__}"
+
+    def __call__(self, x):
+        return self.f(self.g(x))
+
+
+@identical.dispatch
+def identical(x: _Composition, y: _Composition):
+    return identical(x.f, y.f) and identical(x.g, y.g)
+
+
+@fingerprint.dispatch
+def fingerprint(x: _Composition):
+    return hash((_Composition, fingerprint(x.f), fingerprint(x.g)))
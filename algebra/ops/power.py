@@ -0,0 +1,128 @@
+from typing import Union
+
+from .mul import Scaled, Product
+from .. import _dispatch
+from ..algebra import proven, new, Element, Zero, One, Wrapped, mul
+from ..util import identical, fingerprint
+
+__all__ = ["Power"]
+
+
+class Power(Wrapped):
+    """Element raised to a power.
+
+    Args:
+        e (:class:`.algebra.Element`): Element to raise to a power.
+        exponent (int): Exponent. Should be at least two.
+    """
+
+    __slots__ = ("exponent",)
+
+    def __init__(self, e, exponent):
+        Wrapped.__init__(self, e)
+        self.exponent = exponent
+
+    @property
+    def num_factors(self):
+        return self.exponent * self[0].num_factors
+
+    def factor(self, i):
+        if not 0 <= i < self.num_factors:
+            raise IndexError("Index out of range.")
+        else:
+            return self[0].factor(i % self[0].num_factors)
+
+    def factors(self):
+        for _ in range(self.exponent):
+            yield from self[0].factors()
+
+    def render_wrap(self, e, formatter):
+        return f"{e} ** {self.exponent}"
+
+    @_dispatch
+    def __eq__(self, other: "Power"):
+        return self[0] == other[0] and identical(self.exponent, other.exponent)
+
+    def structural_hash(self):
+        return hash((Power, hash(self[0]), fingerprint(self.exponent)))
+
+
+# Powers bind more tightly than products and scaling.
+
+
+@_dispatch
+def need_parens(el: Power, parent: Product):
+    return False
+
+
+@_dispatch
+def need_parens(el: Power, parent: Scaled):
+    return False
+
+
+# Generic exponentiation.
+
+
+@_dispatch
+def power(a: Element, exponent: int):
+    if exponent == 1:
+        return a
+    try:
+        return new(a, Power)(a, exponent)
+    except RuntimeError:
+        # The algebra does not support powers. Construct the power by repeated
+        # squaring instead.
+        return _square_and_multiply(a, exponent)
+
+
+def _square_and_multiply(a, exponent):
+    # Multiplication would fold the factors back into a power, so construct the
+    # products directly.
+    result = None
+    while exponent > 0:
+        if exponent % 2 == 1:
+            result = a if result is None else new(a, Product)(result, a)
+        exponent //= 2
+        if exponent > 0:
+            a = new(a, Product)(a, a)
+    return result
+
+
+# Lazy exponentiation.
+
+
+@_dispatch
+def lazy_power(a: Element, exponent: int):
+    if exponent == 1:
+        return a
+    try:
+        return new(a, Power)(a, exponent)
+    except RuntimeError:
+        # The algebra does not support powers, so the power cannot be recorded.
+        return power(a, exponent)
+
+
+# Cancel redundant zeros and ones.
+
+
+@_dispatch(precedence=proven())
+def power(a: Union[Zero, One], exponent: int):
+    return a
+
+
+# Group factors if possible.
+
+
+@_dispatch
+def power(a: Scaled, exponent: int):
+    return mul(a.scale ** exponent, power(a[0], exponent))
+
+
+@_dispatch
+def power(a: Power, exponent: int):
+    return power(a[0], a.exponent * exponent)
+
+
+@_dispatch
+def _split_power(a: Power):
+    return a[0], a.exponent
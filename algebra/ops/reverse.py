@@ -1,3 +1,5 @@
+import weakref
+from functools import wraps
 from typing import Union
 
 from .diff import DerivativeFunction
@@ -7,7 +9,7 @@ from .stretch import StretchedFunction
 from .tensor import TensorProductFunction
 from .transform import InputTransformedFunction
 from .. import _dispatch
-from ..algebra import proven, new, add, mul
+from ..algebra import proven, new, mul, power
 from ..function import (
     Function,
     OneFunction,
@@ -16,11 +18,13 @@ from ..function import (
     ScaledFunction,
     SumFunction,
     ProductFunction,
+    PowerFunction,
     stretch,
     shift,
     select,
     transform,
     diff,
+    _lazy_wrappers,
 )
 
 __all__ = ["ReversedFunction"]
@@ -33,6 +37,8 @@ class ReversedFunction(WrappedFunction):
         e (:class:`.elements.Function`): Function to reverse arguments of.
     """
 
+    __slots__ = ()
+
     def render_wrap(self, e, formatter):
         return f"Reversed({e})"
 
@@ -40,6 +46,9 @@ class ReversedFunction(WrappedFunction):
     def __eq__(self, other: "ReversedFunction"):
         return self[0] == other[0]
 
+    def structural_hash(self):
+        return hash((ReversedFunction, hash(self[0])))
+
 
 # A reversed elements will never need parentheses.
 
@@ -54,15 +63,56 @@ def need_parens(el: ReversedFunction, parent: Function):
     return False
 
 
+def _memoise(f):
+    """Decorator which caches the result of reversing a function on the function
+    itself. The reversal of the result is cached as well, so reversing twice gives
+    the original function back.
+
+    Both directions of the cache are weak references. A reversal typically refers to
+    the original function, so strong references would create cycles.
+
+    Args:
+        f (function): Method of :func:`.function.reverse`.
+
+    Returns:
+        function: Memoised method.
+    """
+
+    @wraps(f)
+    def memoised(a):
+        try:
+            a_reversed = a._reversed()
+            if a_reversed is not None:
+                return a_reversed
+        except AttributeError:
+            pass
+        a_reversed = f(a)
+        a._reversed = weakref.ref(a_reversed)
+        try:
+            if a_reversed._reversed() is not None:
+                return a_reversed
+        except AttributeError:
+            pass
+        a_reversed._reversed = weakref.ref(a)
+        return a_reversed
+
+    return memoised
+
+
 # Implement basic methods for reverse function.
 
 
+_lazy_wrappers["reverse"] = ReversedFunction
+
+
 @_dispatch
+@_memoise
 def reverse(a: Function):
     return new(a, ReversedFunction)(a)
 
 
 @_dispatch
+@_memoise
 def reverse(a: Union[ZeroFunction, OneFunction]):
     return a
 
@@ -71,53 +121,69 @@ def reverse(a: Union[ZeroFunction, OneFunction]):
 
 
 @_dispatch
+@_memoise
 def reverse(a: SumFunction):
-    return add(reverse(a[0]), reverse(a[1]))
+    return new(a, SumFunction)(*(reverse(e) for e in a.es))
 
 
 @_dispatch
+@_memoise
 def reverse(a: ProductFunction):
-    return mul(reverse(a[0]), reverse(a[1]))
+    return new(a, ProductFunction)(*(reverse(e) for e in a.es))
 
 
 @_dispatch
+@_memoise
 def reverse(a: ScaledFunction):
     return mul(a.scale, reverse(a[0]))
 
 
+@_dispatch
+@_memoise
+def reverse(a: PowerFunction):
+    return power(reverse(a[0]), a.exponent)
+
+
 # Let reversal synergise with wrapped kernels.
 
 
 @_dispatch
+@_memoise
 def reverse(a: ReversedFunction):
     return a[0]
 
 
 @_dispatch
+@_memoise
 def reverse(a: StretchedFunction):
     return stretch(reverse(a[0]), *reversed(a.stretches))
 
 
 @_dispatch
+@_memoise
 def reverse(a: ShiftedFunction):
     return shift(reverse(a[0]), *reversed(a.shifts))
 
 
 @_dispatch
+@_memoise
 def reverse(a: SelectedFunction):
     return select(reverse(a[0]), *reversed(a.dims))
 
 
 @_dispatch
+@_memoise
 def reverse(a: InputTransformedFunction):
     return transform(reverse(a[0]), *reversed(a.fs))
 
 
 @_dispatch
+@_memoise
 def reverse(a: DerivativeFunction):
     return diff(reverse(a[0]), *reversed(a.derivs))
 
 
 @_dispatch
+@_memoise
 def reverse(a: TensorProductFunction):
     return new(a, TensorProductFunction)(*reversed(a.fs))
@@ -4,8 +4,14 @@ import lab as B
 
 from .. import _dispatch
 from ..algebra import proven, new
-from ..function import Function, OneFunction, ZeroFunction, WrappedFunction
-from ..util import squeeze, identical
+from ..function import (
+    Function,
+    OneFunction,
+    ZeroFunction,
+    WrappedFunction,
+    _lazy_wrappers,
+)
+from ..util import squeeze, identical, fingerprint
 
 __all__ = ["SelectedFunction"]
 
@@ -18,6 +24,8 @@ class SelectedFunction(WrappedFunction):
         *dims (tensor): Dimensions to select.
     """
 
+    __slots__ = ("dims",)
+
     def __init__(self, e, *dims):
         WrappedFunction.__init__(self, e)
         self.dims = tuple(None if x is None else _to_list(x) for x in dims)
@@ -29,6 +37,9 @@ class SelectedFunction(WrappedFunction):
     def __eq__(self, other: "SelectedFunction"):
         return self[0] == other[0] and identical(self.dims, other.dims)
 
+    def structural_hash(self):
+        return hash((SelectedFunction, hash(self[0]), fingerprint(self.dims)))
+
 
 def _to_list(x):
     if B.rank(x) == 0:
@@ -39,6 +50,9 @@ def _to_list(x):
         raise ValueError(f'Could not convert "{x}" to a list.')
 
 
+_lazy_wrappers["select"] = SelectedFunction
+
+
 @_dispatch
 def select(a: Function, *dims):
     return new(a, SelectedFunction)(a, *dims)
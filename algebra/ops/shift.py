@@ -4,8 +4,14 @@ import operator
 
 from .. import _dispatch
 from ..algebra import new, proven
-from ..function import Function, OneFunction, ZeroFunction, WrappedFunction
-from ..util import to_tensor, squeeze, broadcast, identical
+from ..function import (
+    Function,
+    OneFunction,
+    ZeroFunction,
+    WrappedFunction,
+    _lazy_wrappers,
+)
+from ..util import to_tensor, squeeze, broadcast, identical, fingerprint
 
 __all__ = ["ShiftedFunction"]
 
@@ -18,6 +24,8 @@ class ShiftedFunction(WrappedFunction):
         *shifts (tensor): Shift amounts.
     """
 
+    __slots__ = ("shifts",)
+
     def __init__(self, e, *shifts):
         WrappedFunction.__init__(self, e)
         self.shifts = tuple(to_tensor(x) for x in shifts)
@@ -30,6 +38,12 @@ class ShiftedFunction(WrappedFunction):
     def __eq__(self, other: "ShiftedFunction"):
         return self[0] == other[0] and identical(self.shifts, other.shifts)
 
+    def structural_hash(self):
+        return hash((ShiftedFunction, hash(self[0]), fingerprint(self.shifts)))
+
+
+_lazy_wrappers["shift"] = ShiftedFunction
+
 
 @_dispatch
 def shift(a: Function, *shifts):
@@ -0,0 +1,110 @@
+from .add import Sum, SumBuilder
+from .diff import DerivativeFunction
+from .mul import Scaled, Product, ProductBuilder
+from .power import Power
+from .reverse import ReversedFunction
+from .select import SelectedFunction
+from .shift import ShiftedFunction
+from .stretch import StretchedFunction
+from .transform import InputTransformedFunction
+from .. import _dispatch
+from ..algebra import lazy, Element, mul, power
+from ..function import stretch, shift, select, transform, diff, reverse
+from ..graph import children, rebuild, walk
+
+__all__ = ["simplify"]
+
+
+def simplify(a):
+    """Apply the simplification rules to an element, which is typically an element
+    constructed in :func:`.algebra.lazy`. Every operation is performed again in
+    normal mode, from the leaves up, and like terms in sums are collected.
+
+    Every distinct subexpression is simplified only once, and the simplification
+    does not recurse, so deep elements can be simplified.
+
+    Args:
+        a (:class:`.algebra.Element`): Element to simplify.
+
+    Returns:
+        :class:`.algebra.Element`: Simplified element.
+    """
+    simplified = {}
+    with lazy(False):
+        # Children are visited before their parents, so they are already simplified.
+        for e in walk(a):
+            es = tuple(simplified[id(c)] for c in children(e))
+            simplified[id(e)] = _simplify(e, es)
+    return simplified[id(a)]
+
+
+@_dispatch
+def _simplify(a: Element, es):
+    """Simplify an element given its simplified children.
+
+    Args:
+        a (:class:`.algebra.Element`): Element to simplify.
+        es (tuple[:class:`.algebra.Element`]): Simplified children of `a`.
+
+    Returns:
+        :class:`.algebra.Element`: Simplified element.
+    """
+    # Elements which cannot be simplified still get simplified children.
+    return rebuild(a, es)
+
+
+@_dispatch
+def _simplify(a: Sum, es):
+    # Lazy sums are flattened, so like terms may not be adjacent.
+    builder = SumBuilder(a)
+    for e in es:
+        builder.append(e)
+    return builder.build()
+
+
+@_dispatch
+def _simplify(a: Product, es):
+    builder = ProductBuilder(a)
+    for e in es:
+        builder.append(e)
+    return builder.build()
+
+
+@_dispatch
+def _simplify(a: Scaled, es):
+    return mul(a.scale, es[0])
+
+
+@_dispatch
+def _simplify(a: Power, es):
+    return power(es[0], a.exponent)
+
+
+@_dispatch
+def _simplify(a: StretchedFunction, es):
+    return stretch(es[0], *a.stretches)
+
+
+@_dispatch
+def _simplify(a: ShiftedFunction, es):
+    return shift(es[0], *a.shifts)
+
+
+@_dispatch
+def _simplify(a: SelectedFunction, es):
+    return select(es[0], *a.dims)
+
+
+@_dispatch
+def _simplify(a: InputTransformedFunction, es):
+    return transform(es[0], *a.fs)
+
+
+@_dispatch
+def _simplify(a: DerivativeFunction, es):
+    return diff(es[0], *a.derivs)
+
+
+@_dispatch
+def _simplify(a: ReversedFunction, es):
+    return reverse(es[0])
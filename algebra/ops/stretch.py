@@ -3,8 +3,14 @@ from typing import Union
 
 from .. import _dispatch
 from ..algebra import proven, new
-from ..function import Function, OneFunction, ZeroFunction, WrappedFunction
-from ..util import to_tensor, squeeze, identical, broadcast
+from ..function import (
+    Function,
+    OneFunction,
+    ZeroFunction,
+    WrappedFunction,
+    _lazy_wrappers,
+)
+from ..util import to_tensor, squeeze, identical, fingerprint, broadcast
 
 __all__ = ["StretchedFunction"]
 
@@ -17,6 +23,8 @@ class StretchedFunction(WrappedFunction):
         *stretches (tensor): Extent of stretches.
     """
 
+    __slots__ = ("stretches",)
+
     def __init__(self, e, *stretches):
         WrappedFunction.__init__(self, e)
         self.stretches = tuple(to_tensor(x) for x in stretches)
@@ -29,6 +37,12 @@ class StretchedFunction(WrappedFunction):
     def __eq__(self, other: "StretchedFunction"):
         return self[0] == other[0] and identical(self.stretches, other.stretches)
 
+    def structural_hash(self):
+        return hash((StretchedFunction, hash(self[0]), fingerprint(self.stretches)))
+
+
+_lazy_wrappers["stretch"] = StretchedFunction
+
 
 @_dispatch
 def stretch(a: Function, *stretches):
@@ -3,7 +3,7 @@ from types import FunctionType as PythonFunction
 from .. import _dispatch
 from ..algebra import proven, new, add, mul
 from ..function import Function
-from ..util import identical
+from ..util import identical, fingerprint
 
 __all__ = ["TensorProductFunction"]
 
@@ -15,6 +15,8 @@ class TensorProductFunction(Function):
         *fs (function): Per input, a elements.
     """
 
+    __slots__ = ("fs",)
+
     def __init__(self, *fs):
         self.fs = fs
 
@@ -28,6 +30,9 @@ class TensorProductFunction(Function):
     def __eq__(self, other: "TensorProductFunction"):
         return identical(self.fs, other.fs)
 
+    def structural_hash(self):
+        return hash((TensorProductFunction, fingerprint(self.fs)))
+
 
 # A tensor product elements needs parentheses if and only if it has more than
 # one elements.
@@ -2,8 +2,14 @@ from typing import Union
 
 from .. import _dispatch
 from ..algebra import proven, new
-from ..function import Function, OneFunction, ZeroFunction, WrappedFunction
-from ..util import identical
+from ..function import (
+    Function,
+    OneFunction,
+    ZeroFunction,
+    WrappedFunction,
+    _lazy_wrappers,
+)
+from ..util import identical, fingerprint
 
 __all__ = ["InputTransformedFunction"]
 
@@ -17,6 +23,8 @@ class InputTransformedFunction(WrappedFunction):
             do a transformation.
     """
 
+    __slots__ = ("fs",)
+
     def __init__(self, e, *fs):
         WrappedFunction.__init__(self, e)
         self.fs = fs
@@ -36,6 +44,12 @@ class InputTransformedFunction(WrappedFunction):
     def __eq__(self, other: "InputTransformedFunction"):
         return self[0] == other[0] and identical(self.fs, other.fs)
 
+    def structural_hash(self):
+        return hash((InputTransformedFunction, hash(self[0]), fingerprint(self.fs)))
+
+
+_lazy_wrappers["transform"] = InputTransformedFunction
+
 
 @_dispatch
 def transform(a: Function, *fs):
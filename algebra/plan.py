@@ -0,0 +1,427 @@
+import operator
+from functools import partial, reduce
+from typing import Union
+
+import lab as B
+
+from . import _dispatch
+from .algebra import Element, One, Zero, _Identical
+from .ops.add import Sum
+from .ops.batch import BatchedFunction
+from .ops.mul import Scaled, Product
+from .ops.power import Power
+from .ops.reverse import ReversedFunction
+from .ops.select import SelectedFunction
+from .ops.shift import ShiftedFunction
+from .ops.stretch import StretchedFunction
+from .ops.transform import InputTransformedFunction
+from .util import fingerprint
+
+__all__ = ["Plan", "compile_plan"]
+
+
+class Plan:
+    """Flat execution plan of an element. A plan consists of a list of steps which
+    read from and write to registers. The first registers hold the inputs.
+
+    Args:
+        steps (list[tuple]): Steps of the form `(f, ins, out)`, which sets register
+            `out` to `f` applied to the values of registers `ins`.
+        num_registers (int): Number of registers.
+        num_inputs (int): Number of inputs.
+        output (int): Register which holds the output.
+        keys (dict, optional): For registers which hold the values of elements, keys
+            which identify the element and the transformations of the inputs.
+        cache (:class:`.cache.EvaluationCache`, optional): Cache for the values of
+            elements.
+    """
+
+    __slots__ = ("steps", "num_registers", "num_inputs", "output", "keys", "cache")
+
+    def __init__(self, steps, num_registers, num_inputs, output, keys=None, cache=None):
+        self.steps = steps
+        self.num_registers = num_registers
+        self.num_inputs = num_inputs
+        self.output = output
+        self.keys = keys or {}
+        self.cache = cache
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __call__(self, *xs):
+        """Execute the plan.
+
+        Args:
+            *xs (tensor): Inputs.
+
+        Returns:
+            tensor: Output.
+        """
+        if len(xs) != self.num_inputs:
+            raise ValueError(
+                f"Plan takes {self.num_inputs} input(s), but {len(xs)} were given."
+            )
+        regs = list(xs) + [None] * (self.num_registers - self.num_inputs)
+        tokens = None
+        if self.cache is not None:
+            tokens = tuple(_content_fingerprint(x) for x in xs)
+        if tokens is None or None in tokens:
+            for f, ins, out in self.steps:
+                regs[out] = f(*[regs[i] for i in ins])
+        else:
+            self._call_cached(regs, tokens)
+        return regs[self.output]
+
+    def _call_cached(self, regs, tokens):
+        # First determine which steps need to be executed. Walk through the steps in
+        # reverse order, so the steps which need a register are visited before the
+        # step which computes it. A cached value makes the inputs of its step
+        # unnecessary.
+        needed = [False] * self.num_registers
+        needed[self.output] = True
+        execute = []
+        for step in reversed(self.steps):
+            f, ins, out = step
+            if not needed[out]:
+                continue
+            if out in self.keys:
+                try:
+                    regs[out] = self.cache.get((self.keys[out], tokens))
+                    continue
+                except KeyError:
+                    pass
+            execute.append(step)
+            for i in ins:
+                needed[i] = True
+
+        # Then execute the steps and cache the values of elements.
+        for f, ins, out in reversed(execute):
+            regs[out] = f(*[regs[i] for i in ins])
+            if out in self.keys:
+                self.cache.put((self.keys[out], tokens), regs[out])
+
+
+def compile_plan(e, evaluators, num_inputs=1, cache=None):
+    """Compile an element into a flat execution plan. Equal subexpressions which are
+    evaluated at the same inputs are evaluated only once, and so are equal
+    transformations of the inputs.
+
+    Args:
+        e (:class:`.algebra.Element`): Element to compile.
+        evaluators (dict): Evaluators of leaves. Maps a type of element to a function
+            which takes in the element and the inputs and returns the value of the
+            element. An evaluator applies to all subclasses of the type, and may
+            also be given for types which can be compiled otherwise. Evaluators
+            for :class:`.algebra.Zero` and :class:`.algebra.One` default to `0`
+            and `1`. A :class:`.ops.batch.BatchedFunction` is evaluated at all its
+            copies at once by stacking the inputs along a new first dimension, so
+            the function in the batch must evaluate elementwise along that
+            dimension. Otherwise, register an evaluator for the batch.
+        num_inputs (int, optional): Number of inputs. Defaults to `1`.
+        cache (:class:`.cache.EvaluationCache`, optional): Cache for the values of
+            all subexpressions. Values are identified by the subexpression, the
+            transformations of the inputs, and the fingerprints of the inputs, so
+            subexpressions shared between plans also use the cache. Inputs must
+            therefore not be modified in place. Only NumPy arrays, numbers, and
+            tuples and lists of those have fingerprints determined by their
+            contents, so other inputs bypass the cache.
+
+    Returns:
+        :class:`.plan.Plan`: Plan which evaluates `e`.
+    """
+    compiler = _Compiler(evaluators, num_inputs)
+    output = compiler.compile(e)
+    return Plan(
+        compiler.steps,
+        compiler.num_registers,
+        num_inputs,
+        output,
+        keys=compiler.keys,
+        cache=cache,
+    )
+
+
+@_dispatch
+def _content_fingerprint(x):
+    """Compute a fingerprint of an input which is determined by its contents.
+
+    Args:
+        x (object): Input.
+
+    Returns:
+        int or None: Fingerprint of `x`, or `None` if the fingerprint of `x` would
+            not be determined by its contents, e.g. because it is the identity.
+    """
+    return None
+
+
+@_dispatch
+def _content_fingerprint(x: B.NPNumeric):
+    return fingerprint(x)
+
+
+@_dispatch
+def _content_fingerprint(x: B.Number):
+    return fingerprint(x)
+
+
+@_dispatch
+def _content_fingerprint(x: Union[tuple, list]):
+    fps = tuple(_content_fingerprint(xi) for xi in x)
+    return None if None in fps else hash(fps)
+
+
+class _Compiler:
+    """State of the compilation of a plan.
+
+    Args:
+        evaluators (dict): Evaluators of leaves.
+        num_inputs (int): Number of inputs.
+    """
+
+    def __init__(self, evaluators, num_inputs):
+        self.evaluators = evaluators
+        self.num_inputs = num_inputs
+        self.steps = []
+        self.num_registers = num_inputs
+        self.keys = {}
+        self._values = {}
+        self._inputs = {}
+        # Describe every input register by the transformations of the inputs which
+        # it holds.
+        self._contexts = {i: i for i in range(num_inputs)}
+
+    def emit(self, f, ins):
+        """Append a step to the plan.
+
+        Args:
+            f (function): Function to apply.
+            ins (tuple[int]): Registers of the arguments.
+
+        Returns:
+            int: Register of the result.
+        """
+        out = self.num_registers
+        self.num_registers += 1
+        self.steps.append((f, tuple(ins), out))
+        return out
+
+    def map_input(self, op, x, param):
+        """Transform an input, reusing an earlier equal transformation.
+
+        Args:
+            op (function): Binary operation which transforms the input.
+            x (int): Register of the input.
+            param (object): Parameter of the transformation.
+
+        Returns:
+            int: Register of the transformed input.
+        """
+        key = (op, x, _Identical(param))
+        try:
+            return self._inputs[key]
+        except KeyError:
+            out = self.emit(partial(_flip, op, param), (x,))
+            self._inputs[key] = out
+            self._contexts[out] = (op, self._contexts[x], _Identical(param))
+            return out
+
+    def map_inputs(self, op, xs, params):
+        """Transform every input with its own parameter.
+
+        Args:
+            op (function): Binary operation which transforms the inputs.
+            xs (tuple[int]): Registers of the inputs.
+            params (tuple): Per input, the parameter. Set to `None` to not transform
+                that input. If only one parameter is given, it is used for all
+                inputs.
+
+        Returns:
+            tuple[int]: Registers of the transformed inputs.
+        """
+        if len(params) == 1:
+            params = params * len(xs)
+        if len(params) != len(xs):
+            raise ValueError(
+                f"Expected {len(xs)} parameter(s) for the inputs, "
+                f"but got {len(params)}."
+            )
+        return tuple(
+            x if p is None else self.map_input(op, x, p) for x, p in zip(xs, params)
+        )
+
+    def compile(self, e):
+        """Compile an element.
+
+        Args:
+            e (:class:`.algebra.Element`): Element to compile.
+
+        Returns:
+            int: Register of the value of `e`.
+        """
+        root = (e, tuple(range(self.num_inputs)))
+        # Traverse the element with an explicit stack, so deep elements can be
+        # compiled.
+        stack = [(root, None)]
+        while stack:
+            key, pending = stack.pop()
+            if key in self._values:
+                continue
+            if pending is None:
+                children, combine = self._expand(*key)
+                stack.append((key, (children, combine)))
+                stack.extend((child, None) for child in reversed(children))
+            else:
+                children, combine = pending
+                num_registers = self.num_registers
+                out = combine([self._values[c] for c in children])
+                if out >= num_registers:
+                    # The element got its own step, so its value can be cached.
+                    e, xs = key
+                    self.keys[out] = (e, tuple(self._contexts[x] for x in xs))
+                self._values[key] = out
+        return self._values[root]
+
+    def _expand(self, e, xs):
+        for t in type(e).__mro__:
+            if t in self.evaluators:
+                evaluator = self.evaluators[t]
+                return [], lambda _: self.emit(partial(evaluator, e), xs)
+        return _compile(e, self, xs)
+
+
+def _flip(op, param, x):
+    return op(x, param)
+
+
+def _sum(*xs):
+    return reduce(operator.add, xs)
+
+
+def _product(*xs):
+    return reduce(operator.mul, xs)
+
+
+def _only(regs):
+    return regs[0]
+
+
+@_dispatch
+def _compile(e: Element, compiler, xs):
+    """Determine how to compile an element.
+
+    Args:
+        e (:class:`.algebra.Element`): Element to compile.
+        compiler (:class:`._Compiler`): Compiler.
+        xs (tuple[int]): Registers of the inputs.
+
+    Returns:
+        tuple: Tuple containing a list of tuples of children and the registers of
+            the inputs to evaluate them at, and a function which takes in the
+            registers of the values of the children and returns the register of
+            the value of `e`.
+    """
+    raise NotImplementedError(
+        f'Compilation not implemented for "{type(e).__name__}". '
+        f"Please register an evaluator."
+    )
+
+
+@_dispatch
+def _compile(e: Zero, compiler, xs):
+    return [], lambda _: compiler.emit(partial(_constant, 0), ())
+
+
+@_dispatch
+def _compile(e: One, compiler, xs):
+    return [], lambda _: compiler.emit(partial(_constant, 1), ())
+
+
+def _constant(x):
+    return x
+
+
+@_dispatch
+def _compile(e: Scaled, compiler, xs):
+    return [(e[0], xs)], lambda regs: compiler.emit(
+        partial(operator.mul, e.scale), regs
+    )
+
+
+@_dispatch
+def _compile(e: Power, compiler, xs):
+    return [(e[0], xs)], lambda regs: compiler.emit(
+        partial(_flip, operator.pow, e.exponent), regs
+    )
+
+
+@_dispatch
+def _compile(e: Sum, compiler, xs):
+    return [(t, xs) for t in e.es], lambda regs: compiler.emit(_sum, regs)
+
+
+@_dispatch
+def _compile(e: Product, compiler, xs):
+    return [(f, xs) for f in e.es], lambda regs: compiler.emit(_product, regs)
+
+
+@_dispatch
+def _compile(e: BatchedFunction, compiler, xs):
+    # Evaluate the function once at the inputs transformed for all copies at once,
+    # which are stacked along a new first dimension, and sum the scaled copies.
+    xs = compiler.map_inputs(_batch_inputs, xs, ((e.stretches, e.shifts),))
+    return [(e[0], xs)], lambda regs: compiler.emit(partial(_contract, e.scales), regs)
+
+
+def _batch_inputs(x, params):
+    stretches, shifts = params
+    return (x - _stackable(shifts, x)) / _stackable(stretches, x)
+
+
+def _stackable(param, x):
+    # Reshape a batch of parameters to broadcast against inputs stacked along a new
+    # first dimension.
+    shape = B.shape(param)
+    ones = (1,) * (B.rank(x) - len(shape) + 1)
+    return B.reshape(param, shape[0], *ones, *shape[1:])
+
+
+def _contract(scales, y):
+    return B.sum(_stackable(scales, y[0]) * y, axis=0)
+
+
+# Wrapped functions which only transform the inputs do not need steps of their own.
+
+
+@_dispatch
+def _compile(e: StretchedFunction, compiler, xs):
+    return [(e[0], compiler.map_inputs(operator.truediv, xs, e.stretches))], _only
+
+
+@_dispatch
+def _compile(e: ShiftedFunction, compiler, xs):
+    return [(e[0], compiler.map_inputs(operator.sub, xs, e.shifts))], _only
+
+
+@_dispatch
+def _compile(e: SelectedFunction, compiler, xs):
+    return [(e[0], compiler.map_inputs(_select, xs, e.dims))], _only
+
+
+def _select(x, dims):
+    return B.take(x, dims, axis=-1)
+
+
+@_dispatch
+def _compile(e: InputTransformedFunction, compiler, xs):
+    return [(e[0], compiler.map_inputs(_transform, xs, e.fs))], _only
+
+
+def _transform(x, f):
+    return f(x)
+
+
+@_dispatch
+def _compile(e: ReversedFunction, compiler, xs):
+    return [(e[0], xs[::-1])], _only
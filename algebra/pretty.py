@@ -1,25 +1,24 @@
 from typing import Union
 
 from . import _dispatch
-from .algebra import pretty_print, Element, Wrapped, Join
+from .algebra import pretty_print, iter_render, Element, Wrapped, Join
 from .ops.add import Sum
 from .ops.mul import Scaled, Product
+from .util import MethodCache
 
 __all__ = []
 
+_placeholder = "\x00"  #: Stands in for the renderings of children in templates.
+
 
 @_dispatch
-def pretty_print(el: Wrapped, formatter):
-    return el.render_wrap(pretty_print(el[0], el, formatter), formatter)
+def pretty_print(el: Union[Wrapped, Join], formatter):
+    return "".join(_render(el, formatter))
 
 
 @_dispatch
-def pretty_print(el: Join, formatter):
-    return el.render_join(
-        pretty_print(el[0], el, formatter),
-        pretty_print(el[1], el, formatter),
-        formatter,
-    )
+def iter_render(el: Union[Wrapped, Join], formatter, max_terms, max_depth):
+    return _render(el, formatter, max_terms, max_depth)
 
 
 @_dispatch
@@ -30,6 +29,90 @@ def pretty_print(el: Element, parent: Element, formatter):
         return pretty_print(el, formatter)
 
 
+def _render(el, formatter, max_terms=None, max_depth=None):
+    """Render an element without recursion.
+
+    Every distinct element is converted to a template once. A template consists of
+    strings and the children of the element, which are then expanded by traversing
+    the element with an explicit stack.
+
+    Args:
+        el (:class:`.algebra.Element`): Element to render.
+        formatter (object): Formatter for values.
+        max_terms (int, optional): Maximum number of elements to display of any
+            join.
+        max_depth (int, optional): Maximum depth to display.
+
+    Returns:
+        iterator: Iterator over pieces of the rendering.
+    """
+    templates = {}
+    stack = [(el, None, 1)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            if item:
+                yield item
+            continue
+        el, parent, depth = item
+        if max_depth is not None and depth > max_depth:
+            yield "..."
+            continue
+        try:
+            template = templates[id(el)]
+        except KeyError:
+            template = _template(el, formatter, max_terms)
+            templates[id(el)] = template
+        parens = parent is not None and _need_parens(el, parent)
+        if parens:
+            stack.append(")")
+        for piece in reversed(template):
+            stack.append(piece if isinstance(piece, str) else (piece, el, depth + 1))
+        if parens:
+            stack.append("(")
+
+
+def _template(el, formatter, max_terms):
+    method = _pretty_print.resolve(type(el), type(formatter))
+    if method not in _default_methods:
+        # A custom method has been defined, which we must respect.
+        return [pretty_print(el, formatter)]
+    elif isinstance(el, Wrapped):
+        # Render the wrapped element with a placeholder to find out what comes
+        # before and after it.
+        prefix_suffix = el.render_wrap(_placeholder, formatter).split(_placeholder)
+        if len(prefix_suffix) == 2:
+            return [prefix_suffix[0], el.e, prefix_suffix[1]]
+        else:
+            return [el.render_wrap(pretty_print(el.e, el, formatter), formatter)]
+    elif isinstance(el, Join):
+        # If `render_join(x, y)` gives `p + x + s + y + q`, then folding
+        # `render_join` over `e1, e2, e3` gives `p + p + e1 + s + e2 + q + s + e3 + q`.
+        parts = el.render_join(_placeholder, _placeholder, formatter)
+        parts = parts.split(_placeholder)
+        es = el.es
+        if max_terms is not None and len(es) > max(max_terms, 1):
+            # Only display the first `max_terms` elements and replace the others
+            # by a single `...`.
+            es = es[: max(max_terms, 1)] + ("...",)
+        if len(parts) == 3:
+            prefix, separator, suffix = parts
+            template = [prefix * (len(es) - 1), es[0]]
+            for e in es[1:]:
+                template.extend([separator, e, suffix])
+            return template
+        else:
+            es = [
+                e if isinstance(e, str) else pretty_print(e, el, formatter) for e in es
+            ]
+            rendering = es[0]
+            for e in es[1:]:
+                rendering = el.render_join(rendering, e, formatter)
+            return [rendering]
+    else:
+        return [el.render(formatter)]
+
+
 @_dispatch
 def need_parens(el: Element, parent: Sum):
     """Check whether `el` needs parentheses when printed in `parent`.
@@ -72,3 +155,11 @@ def need_parens(el: Union[Wrapped, Join], parent: Wrapped):
 @_dispatch
 def need_parens(el: Union[Product, Scaled], parent: Scaled):
     return False
+
+
+_pretty_print = MethodCache(pretty_print)  #: Resolved methods of `pretty_print`.
+_need_parens = MethodCache(need_parens)  #: Resolved methods of `need_parens`.
+_default_methods = {
+    _pretty_print.resolve(Element, object),
+    _pretty_print.resolve(Wrapped, object),
+}  #: Methods of `pretty_print` which `_template` implements.
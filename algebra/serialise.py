@@ -0,0 +1,293 @@
+import mmap
+import pickle
+import sys
+
+import numpy as np
+
+from .algebra import Element
+from .graph import children
+
+__all__ = ["dumps", "loads"]
+
+_transient = {"_hash", "_reversed", "__weakref__"}  #: Slots which are not saved.
+_caches = {"_terms": None, "_factors": None}  #: Slots which are reset upon loading.
+_alignment = 64  #: Alignment of arrays in the buffer.
+_prefetch_depth = 64  #: Depth below an element of the elements pickled before it.
+
+# Out-of-band buffers require Python 3.8.
+if sys.version_info >= (3, 8):
+    _protocol = 5
+    _wrap_buffer = pickle.PickleBuffer
+else:  # pragma: no cover
+    _protocol = pickle.HIGHEST_PROTOCOL
+    _wrap_buffer = bytes
+
+
+class _Ref:
+    """Reference to an element in the table of nodes.
+
+    Args:
+        i (int): Index of the element in the table.
+    """
+
+    __slots__ = ("i",)
+
+    def __init__(self, i):
+        self.i = i
+
+    def __reduce__(self):
+        return _Ref, (self.i,)
+
+
+class _Array:
+    """Reference to an array in the buffer.
+
+    Args:
+        offset (int): Offset in the buffer in bytes.
+        dtype (str): Data type of the array.
+        shape (tuple[int]): Shape of the array.
+    """
+
+    __slots__ = ("offset", "dtype", "shape")
+
+    def __init__(self, offset, dtype, shape):
+        self.offset = offset
+        self.dtype = dtype
+        self.shape = shape
+
+    def __reduce__(self):
+        return _Array, (self.offset, self.dtype, self.shape)
+
+
+def _get_state(e):
+    state = {}
+    for c in type(e).__mro__:
+        for name in c.__dict__.get("__slots__", ()):
+            if name not in _transient and name not in _caches and hasattr(e, name):
+                state[name] = getattr(e, name)
+    if hasattr(e, "__dict__"):
+        state.update(e.__dict__)
+    return state
+
+
+def _cache_slots(t):
+    for c in t.__mro__:
+        for name in c.__dict__.get("__slots__", ()):
+            if name in _caches:
+                yield name
+
+
+def _elements_in(x):
+    # Find the elements directly referenced by a value of the state of an element.
+    if isinstance(x, Element):
+        yield x
+    elif isinstance(x, (tuple, list)):
+        for xi in x:
+            yield from _elements_in(xi)
+    elif isinstance(x, dict):
+        for xi in x.values():
+            yield from _elements_in(xi)
+
+
+class _Writer:
+    """Build the table of nodes and the buffer of arrays."""
+
+    def __init__(self):
+        self.types = []
+        self.type_indices = {}
+        self.nodes = []
+        self.node_indices = {}
+        self.arrays = []
+        self.array_refs = {}
+        self.size = 0
+
+    def add(self, e):
+        # Add the elements in the order of a post-order traversal, so every element
+        # only refers to elements earlier in the table. Do not recurse to support
+        # deep elements.
+        states = {}
+        stack = [(e, False)]
+        while stack:
+            x, expanded = stack.pop()
+            if id(x) in self.node_indices:
+                continue
+            if id(x) not in states:
+                states[id(x)] = _get_state(x)
+            state = states[id(x)]
+            if expanded:
+                self.node_indices[id(x)] = len(self.nodes)
+                self.nodes.append((self._type_index(type(x)), self._encode(state)))
+            else:
+                stack.append((x, True))
+                for child in reversed(list(_elements_in(list(state.values())))):
+                    if id(child) not in self.node_indices:
+                        stack.append((child, False))
+        return self.node_indices[id(e)]
+
+    def _type_index(self, t):
+        try:
+            return self.type_indices[t]
+        except KeyError:
+            self.type_indices[t] = len(self.types)
+            self.types.append(t)
+            return self.type_indices[t]
+
+    def _encode(self, x):
+        if isinstance(x, Element):
+            return _Ref(self.node_indices[id(x)])
+        elif isinstance(x, np.ndarray) and not x.dtype.hasobject:
+            return self._encode_array(x)
+        elif type(x) in {tuple, list}:
+            return type(x)(self._encode(xi) for xi in x)
+        elif type(x) is dict:
+            return {k: self._encode(v) for k, v in x.items()}
+        else:
+            return x
+
+    def _encode_array(self, x):
+        try:
+            return self.array_refs[id(x)][1]
+        except KeyError:
+            pass
+        # Align the array to allow efficient access upon loading.
+        offset = -(-self.size // _alignment) * _alignment
+        ref = _Array(offset, x.dtype.str, x.shape)
+        data = np.ascontiguousarray(x).reshape(-1).view(np.uint8)
+        self.arrays.append((offset, data))
+        # Keep `x` alive, so its `id` cannot be reused.
+        self.array_refs[id(x)] = (x, ref)
+        self.size = offset + x.nbytes
+        return ref
+
+    def buffer(self):
+        buffer = bytearray(self.size)
+        for offset, x in self.arrays:
+            buffer[offset : offset + x.nbytes] = x.data
+        return buffer
+
+    def write(self, f):
+        # Write the arrays one by one to prevent constructing the buffer in memory.
+        position = 0
+        for offset, x in self.arrays:
+            f.write(bytes(offset - position))
+            f.write(x.data)
+            position = offset + x.nbytes
+
+
+def dumps(e, sidecar=None):
+    """Serialise an element. Shared elements are saved only once, and arrays are
+    stored in one contiguous buffer.
+
+    Args:
+        e (:class:`.algebra.Element`): Element to serialise.
+        sidecar (str, optional): Path of a file to write the buffer of arrays to.
+            Upon loading, this file is memory-mapped rather than read, so processes
+            loading the same element share the memory of the arrays.
+
+    Returns:
+        bytes: Serialisation of `e`.
+    """
+    writer = _Writer()
+    root = writer.add(e)
+    if sidecar is None:
+        buffer = _wrap_buffer(writer.buffer())
+    else:
+        with open(sidecar, "wb") as f:
+            writer.write(f)
+        buffer = None
+    return pickle.dumps(
+        (writer.types, writer.nodes, root, buffer, sidecar), protocol=_protocol
+    )
+
+
+def loads(data, sidecar=None):
+    """Load a serialised element.
+
+    Args:
+        data (bytes): Serialisation of an element produced by
+            :func:`.serialise.dumps`.
+        sidecar (str, optional): Path of the file with the buffer of arrays, if
+            the element was serialised with one. Defaults to the path given to
+            :func:`.serialise.dumps`.
+
+    Returns:
+        :class:`.algebra.Element`: Element. If the element was serialised with a
+            sidecar file, its arrays are read-only views of the memory-mapped file.
+    """
+    types, nodes, root, buffer, default_sidecar = pickle.loads(data)
+    if buffer is None:
+        buffer = _map(sidecar or default_sidecar)
+    return _load(types, nodes, root, memoryview(buffer))
+
+
+def _map(path):
+    with open(path, "rb") as f:
+        try:
+            # The map remains valid after the file is closed.
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped.
+            return b""
+
+
+def _load(types, nodes, root, buffer):
+    # Construct the elements in a single pass over the table.
+    elements = []
+
+    def decode(x):
+        if isinstance(x, _Ref):
+            return elements[x.i]
+        elif isinstance(x, _Array):
+            dtype = np.dtype(x.dtype)
+            count = int(np.prod(x.shape, dtype=int))
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=x.offset)
+            return array.reshape(x.shape)
+        elif type(x) in {tuple, list}:
+            return type(x)(decode(xi) for xi in x)
+        elif type(x) is dict:
+            return {k: decode(v) for k, v in x.items()}
+        else:
+            return x
+
+    for type_index, state in nodes:
+        t = types[type_index]
+        e = object.__new__(t)
+        for name, value in state.items():
+            object.__setattr__(e, name, decode(value))
+        for name in _cache_slots(t):
+            object.__setattr__(e, name, _caches[name])
+        elements.append(e)
+    return elements[root]
+
+
+def _reduce(e):
+    # Pickle an element by its state, so the memo of the pickler shares elements
+    # between everything which is pickled together. The elements `_prefetch_depth`
+    # levels below `e` are pickled before the state of `e`, which bounds the
+    # recursion of the pickler for deep elements.
+    state = _get_state(e)
+    state.update((name, _caches[name]) for name in _cache_slots(type(e)))
+    return _new, (type(e), _frontier(state)), (None, state)
+
+
+def _new(t, prefetched):
+    # The prefetched elements are only passed to bound the recursion of the pickler.
+    return object.__new__(t)
+
+
+def _frontier(state):
+    # Find the elements `_prefetch_depth` levels below an element with the given
+    # state.
+    level = list(_elements_in(list(state.values())))
+    visited = set()
+    for _ in range(_prefetch_depth - 1):
+        next_level = []
+        for x in level:
+            if id(x) not in visited:
+                visited.add(id(x))
+                next_level.extend(children(x))
+        if not next_level:
+            return []
+        level = next_level
+    # Remove duplicates.
+    return list({id(x): x for x in level}.values())
@@ -1,9 +1,20 @@
+import weakref
 from typing import Union
 
 import lab as B
-from plum import Dispatcher
+import numpy as np
+from plum import Dispatcher, is_object
 
-__all__ = ["squeeze", "get_subclasses", "broadcast", "identical", "to_tensor"]
+__all__ = [
+    "squeeze",
+    "get_subclasses",
+    "broadcast",
+    "unordered_equal",
+    "identical",
+    "fingerprint",
+    "to_tensor",
+    "MethodCache",
+]
 
 _dispatch = Dispatcher()
 
@@ -62,6 +73,35 @@ def broadcast(op, xs, ys):
     return tuple(op(x, y) for x, y in zip(xs, ys))
 
 
+def unordered_equal(xs, ys):
+    """Check whether two sequences are equal up to a reordering of their elements.
+    The elements must be hashable consistently with equality. Elements are only
+    compared with others of the same hash, so this takes linear time unless many
+    hashes collide.
+
+    Args:
+        xs (sequence): First sequence.
+        ys (sequence): Second sequence.
+
+    Returns:
+        bool: `xs` and `ys` are equal up to a reordering.
+    """
+    if len(xs) != len(ys):
+        return False
+    unmatched = {}
+    for y in ys:
+        unmatched.setdefault(hash(y), []).append(y)
+    for x in xs:
+        candidates = unmatched.get(hash(x), ())
+        for i, y in enumerate(candidates):
+            if x is y or x == y:
+                del candidates[i]
+                break
+        else:
+            return False
+    return True
+
+
 @_dispatch
 def identical(x, y):
     """Check if two objects `x` are `y` are identical for the purpose of algebraic
@@ -87,6 +127,67 @@ def identical(x: Union[tuple, list], y: Union[tuple, list]):
     return len(x) == len(y) and all([identical(xi, yi) for xi, yi in zip(x, y)])
 
 
+@_dispatch
+def identical(x: B.NPNumeric, y: B.NPNumeric):
+    if x is y:
+        return True
+    if x.shape != y.shape or x.dtype != y.dtype:
+        return False
+    # Only compare the contents if the fingerprints match, which are cached.
+    if fingerprint(x) != fingerprint(y):
+        return False
+    return bool(np.array_equal(x, y))
+
+
+@_dispatch
+def fingerprint(x):
+    """Compute a hash of an object which is consistent with :func:`.util.identical`:
+    identical objects have equal fingerprints.
+
+    Args:
+        x (object): Object to compute fingerprint of.
+
+    Returns:
+        int: Fingerprint of `x`.
+    """
+    try:
+        return hash(x)
+    except TypeError:
+        # The object is not hashable. Since such objects are only identical to
+        # themselves, we can use the identity.
+        return id(x)
+
+
+@_dispatch
+def fingerprint(x: Union[tuple, list]):
+    return hash(tuple(fingerprint(xi) for xi in x))
+
+
+_array_fingerprints = {}  #: Cached fingerprints of arrays indexed by their ids.
+
+
+@_dispatch
+def fingerprint(x: B.NPNumeric):
+    try:
+        ref, fp = _array_fingerprints[id(x)]
+        if ref() is x:
+            return fp
+    except KeyError:
+        pass
+    fp = hash((x.shape, x.dtype.str, x.tobytes()))
+    # Remove the fingerprint from the cache once the array is garbage collected.
+    # Arrays are assumed to not be modified in place after their fingerprint has
+    # been computed.
+    key = id(x)
+
+    def remove(ref):
+        if _array_fingerprints.get(key, (None,))[0] is ref:
+            del _array_fingerprints[key]
+
+    _array_fingerprints[key] = (weakref.ref(x, remove), fp)
+    return fp
+
+
 @_dispatch
 def to_tensor(x: B.Numeric):
     """Convert object to tensor.
@@ -103,3 +204,95 @@ def to_tensor(x: B.Numeric):
 @_dispatch
 def to_tensor(x: Union[tuple, list]):
     return B.stack(*x, axis=0)
+
+
+class MethodCache:
+    """Call a function, caching the resolved method per types of the arguments.
+
+    This skips signature resolution entirely for calls with types of arguments that
+    have been seen before. The cache is invalidated whenever methods are registered
+    with the function.
+
+    Args:
+        f (function): Function to call.
+
+    Attributes:
+        version (int): Number of times that the cache was invalidated.
+    """
+
+    def __init__(self, f):
+        self._f = f
+        self._methods = {}
+        self._resolved = None
+        self._num_resolved = 0
+        self.version = 0
+        # This relies on the internals of Plum's functions. If those are not
+        # available, simply call the function.
+        self._supported = all(
+            hasattr(f, attr)
+            for attr in ["_pending", "_resolved", "_runtime_type_of", "resolve_method"]
+        )
+
+    def _valid(self):
+        # Registering a method appends to the resolved registrations of `f`, and
+        # clearing the cache of `f` replaces them, so this detects both without
+        # touching the cache of `f`.
+        f = self._f
+        return (
+            len(f._pending) == 0
+            and f._resolved is self._resolved
+            and len(f._resolved) == self._num_resolved
+        )
+
+    def _validate(self):
+        f = self._f
+        if len(f._pending) > 0:
+            f._resolve_pending_registrations()
+        if not self._valid():
+            self._methods.clear()
+            self.version += 1
+            self._resolved = f._resolved
+            self._num_resolved = len(f._resolved)
+
+    def resolve(self, *types):
+        """Get the method of the function for particular types of arguments.
+
+        Args:
+            *types (type): Types of the arguments.
+
+        Returns:
+            function: Method. If the function is not supported, the function itself
+                is returned.
+        """
+        if not self._supported:
+            return self._f
+        self._validate()
+        try:
+            return self._methods[types]
+        except KeyError:
+            method, return_type = self._f.resolve_method(*types)
+            if not is_object(return_type):
+                # The return value must be converted, which `invoke` does.
+                method = self._f.invoke(*types)
+            self._methods[types] = method
+            return method
+
+    def __call__(self, *args):
+        if not self._supported:
+            return self._f(*args)
+        f = self._f
+        # Inline :meth:`MethodCache._valid`, because this is called very often.
+        if (
+            len(f._pending) > 0
+            or f._resolved is not self._resolved
+            or len(f._resolved) != self._num_resolved
+        ):
+            self._validate()
+        if f._runtime_type_of:
+            return f(*args)
+        types = tuple([type(arg) for arg in args])
+        try:
+            method = self._methods[types]
+        except KeyError:
+            method = self.resolve(*types)
+        return method(*args)
@@ -1,6 +1,8 @@
-from algebra import One, Zero
+import numpy as np
 
-from .util import a, b
+from algebra import One, Zero, Sum, collect, SumBuilder, factorise
+
+from .util import a, b, c, approx
 
 
 def test_add_zero():
@@ -87,3 +89,71 @@ def test_grouping():
 
     assert str(2 * a + 2 * a) == "4 * a"
     assert str(2 * a + 2 * b) == "2 * a + 2 * b"
+
+
+def test_collect():
+    assert str(collect(a)) == "a"
+    assert str(collect(a + b + a)) == "2 * a + b"
+    assert str(collect(a + b + 2 * a + 3 * b + c)) == "3 * a + 4 * b + c"
+    assert str(collect(a * b + b + b * a)) == "2 * a * b + b"
+
+    # Test cancellation.
+    assert str(collect(a + b - a)) == "b"
+    assert str(collect(a + b - a - b)) == "0"
+
+    # Test that collection does not recurse quadratically.
+    e = Sum(*([a, b, c] * 1000))
+    assert str(collect(e)) == "1000 * a + 1000 * b + 1000 * c"
+
+
+def test_collect_tensors():
+    e = collect(a * np.array([1, 2]) + b + a * np.array([3, 4]))
+    assert str(e[1]) == "b"
+    approx(e[0].scale, np.array([4, 6]))
+
+
+def test_sum_builder():
+    builder = SumBuilder()
+    assert builder.build() == 0
+    builder += a
+    builder += 2 * b
+    builder.append(a + c)
+    assert len(builder) == 3
+    assert str(builder.build()) == "2 * a + 2 * b + c"
+
+    # Test cancellation and numbers.
+    builder += -2 * b
+    builder += 1
+    builder.append(One() + 2)
+    assert str(builder.build()) == "2 * a + c + 4 * 1"
+
+    # Test the template.
+    assert str(SumBuilder(a).build()) == "0"
+    assert str(SumBuilder(a).build() + 1) == "1"
+    builder = SumBuilder(a)
+    builder += a
+    assert builder.build() is a
+
+
+def test_sum_builder_append_heavy():
+    builder = SumBuilder()
+    for i in range(3000):
+        builder += (i % 2) * a + b
+    assert str(builder.build()) == "3000 * b + 1500 * a"
+
+
+def test_factorise():
+    assert str(factorise(a)) == "a"
+    assert str(factorise(a * b + a * c)) == "a * (b + c)"
+    assert str(factorise(2 * a * b + 3 * a * c + b)) == "b + a * (2 * b + 3 * c)"
+    assert str(factorise(a * b * c + a * b * (a + b))) == "a * b * (c + a + b)"
+    assert str(factorise(a + 2 * a * b)) == "a * (1 + 2 * b)"
+
+    # Test that factorisation only applies if it saves evaluations.
+    assert str(factorise(a * b + c)) == "a * b + c"
+    assert str(factorise(a * One() + b * One())) == "a + b"
+
+    # Test that the factor which saves the most evaluations is pulled out first.
+    assert str(factorise(a * (b + c) + b * (b + c) + a * c)) == (
+        "a * c + (b + c) * (a + b)"
+    )
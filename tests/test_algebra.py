@@ -1,8 +1,28 @@
+import gc
+import threading
+import tracemalloc
+
+import numpy as np
 import pytest
 from plum import NotFoundLookupError
 
-from algebra import Element, One, Zero, Scaled, Product, Sum, add, mul, get_algebra, new
+import algebra
+from algebra import (
+    Element,
+    One,
+    Zero,
+    Scaled,
+    Product,
+    Sum,
+    Power,
+    add,
+    mul,
+    get_algebra,
+    new,
+    interning,
+)
 from algebra.algebra import filter_most_specific
+from algebra.ops.power import _square_and_multiply
 from .util import a, b, c
 
 
@@ -35,6 +55,194 @@ def test_equality_sum():
     assert Sum(One(), Zero()) == Sum(One(), Zero())
     assert Sum(One(), Zero()) == Sum(Zero(), One())
     assert Sum(One(), Zero()) != Sum(One(), One())
+    assert Sum(a, Sum(b, c)) == Sum(Sum(a, b), c)
+    assert Sum(a, b, c) == Sum(c, a, b)
+    assert Sum(a, a, b) != Sum(a, b, b)
+
+
+def test_flattening():
+    e = a + b + c
+    assert isinstance(e, Sum)
+    assert len(e.es) == 3
+    assert Sum(a, Sum(b, c)).es == (a, b, c)
+
+    e = a * b * c
+    assert isinstance(e, Product)
+    assert len(e.es) == 3
+    assert Product(Product(a, b), c).es == (a, b, c)
+
+
+def test_flattening_deep():
+    e = a
+    for _ in range(5000):
+        e = e + b
+    assert len(e.es) == 5001
+    assert e.num_terms == 5001
+    assert str(e.term(5000)) == "b"
+    assert str(e).count("+") == 5000
+
+
+def test_flattening_wide():
+    # Test that flattening does not take quadratic time.
+    e = Sum(*([a, Sum(b, c)] * 50_000))
+    assert len(e.es) == 150_000
+    assert len(e[0].es) == 149_999
+
+
+def test_interning():
+    assert Scaled(a, 2) is not Scaled(a, 2)
+
+    with interning():
+        assert Scaled(a, 2) is Scaled(a, 2)
+        assert Scaled(a, 2) is Scaled(a, 2.0)
+        assert Scaled(a, 2) is not Scaled(a, 3)
+        assert Scaled(a, 2) is not Scaled(b, 2)
+        assert a + 2 * b is a + 2 * b
+        assert a * b * c is a * b * c
+
+        # Elements which are only equal to themselves must not be interned.
+        assert Element() is not Element()
+
+        # Tensors are compared by content.
+        x = np.ones(2)
+        assert Scaled(a, x) is Scaled(a, x)
+        assert Scaled(a, x) is Scaled(a, np.ones(2))
+        assert Scaled(a, x) is not Scaled(a, np.ones(3))
+
+    # Interning stops after the context manager exits.
+    assert Scaled(a, 2) is not Scaled(a, 2)
+
+
+def test_interning_weak():
+    with interning():
+        gc.collect()
+        n = len(algebra.algebra._interned)
+        e = Scaled(a, 2)
+        assert len(algebra.algebra._interned) == n + 1
+        del e
+        gc.collect()
+        assert len(algebra.algebra._interned) == n
+
+
+def test_hash():
+    e1 = Element()
+    e2 = Element()
+    assert hash(e1) == hash(e1)
+    assert len({e1, e2}) == 2
+
+    assert hash(One()) == hash(One())
+    assert hash(a) == hash(a.__class__())
+    assert hash(Scaled(a, 2)) == hash(Scaled(a, 2.0))
+    assert hash(Scaled(a, np.ones(2))) == hash(Scaled(a, np.ones(2)))
+
+    # Sums and products are commutative.
+    assert hash(a + b + c) == hash(c + (b + a))
+    assert hash(a * b * c) == hash(c * (b * a))
+
+    # Elements can be used in dictionaries and sets.
+    assert len({a + b, b + a, a * b, b * a, 2 * a, 2 * a}) == 3
+    assert {a + b: 1}[b + a] == 1
+
+
+def test_hash_cached():
+    e = a + b
+    h = hash(e)
+    assert e._hash == h
+    assert hash(e) == h
+
+
+def test_hash_and_equality_deep():
+    def build(n, leaf):
+        e = leaf
+        for _ in range(n):
+            e = Product(Sum(e, b), c)
+        return e
+
+    e1 = build(3000, a)
+    e2 = build(3000, a)
+    assert hash(e1) == hash(e2)
+    assert e1 == e2
+    assert e1 != build(3000, b)
+    assert e1 != build(2999, a)
+
+    # The nesting of comparisons is tracked per thread, so concurrent comparisons
+    # do not interfere.
+    results = []
+
+    def compare():
+        results.append(all(e1 == e2 for _ in range(3)))
+
+    threads = [threading.Thread(target=compare) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [True] * 4
+
+
+def test_equality_reassociation():
+    assert a + (b + c) == (a + c) + b
+    assert a * (b * c) == (a * c) * b
+    assert a + (b * c) == (c * b) + a
+    assert a + (b * c) != (c * a) + b
+
+
+def test_equality_deep():
+    def build(depth, leaf):
+        e = leaf
+        for i in range(depth):
+            if i % 2 == 0:
+                e = Sum(e, Product(a, b))
+            else:
+                e = Product(Sum(b, c), e)
+        return e
+
+    # Before canonicalisation, these comparisons took exponential time.
+    assert build(40, a) == build(40, a)
+    assert build(40, a) != build(40, b)
+
+
+def test_equality_many_terms():
+    terms = [Scaled(a, i) for i in range(2000)]
+    assert Sum(*terms) == Sum(*reversed(terms))
+    assert Sum(*terms) != Sum(*terms[1:], Scaled(a, -1))
+
+
+class Unslotted(Element):
+    pass
+
+
+class UnslottedScaled(Unslotted, Scaled):
+    pass
+
+
+@get_algebra.dispatch
+def _get_algebra(e: Unslotted):
+    return Unslotted
+
+
+def test_slots():
+    for e in [One(), Zero(), 2 * One(), One() + Zero(), Product(One(), Zero())]:
+        assert not hasattr(e, "__dict__")
+
+    # Test that subclasses can still add attributes.
+    e = UnslottedScaled(a, 2)
+    e.attribute = 1
+    assert e.attribute == 1
+
+
+def test_slots_memory():
+    def memory_per_node(t, n=1000):
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        nodes = [t(a, 2) for _ in range(n)]
+        for node in nodes:
+            hash(node)
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return (after - before) / n
+
+    assert memory_per_node(Scaled) < memory_per_node(UnslottedScaled)
 
 
 def test_addition():
@@ -72,8 +280,48 @@ def test_power():
         a ** 0.5
     assert str(a ** 0) == "1"
     assert str(a ** 1) == "a"
-    assert str(a ** 2) == "a * a"
-    assert str(a ** 3) == "a * a * a"
+    assert str(a ** 2) == "a ** 2"
+    assert str(a ** 3) == "a ** 3"
+    assert str(One() ** 3) == "1"
+    assert str(Zero() ** 3) == "0"
+
+    # Test that high powers are constant size.
+    e = a ** 1000
+    assert isinstance(e, Power)
+    assert e.exponent == 1000
+
+    # Test grouping.
+    assert str((2 * a) ** 3) == "8 * a ** 3"
+    assert str((a ** 2) ** 3) == "a ** 6"
+    assert str(a ** 2 * a ** 3) == "a ** 5"
+    assert str(a ** 2 * a) == "a ** 3"
+    assert str(a * a ** 2) == "a ** 3"
+    assert str(a ** 2 * b ** 2) == "a ** 2 * b ** 2"
+    assert str((2 * a) * a ** 2) == "2 * a ** 3"
+    assert str(a ** 2 * (2 * a)) == "2 * a ** 3"
+
+    # Test parentheses.
+    assert str((a + b) ** 2) == "(a + b) ** 2"
+    assert str((a * b) ** 2) == "(a * b) ** 2"
+    assert str(3 * (a + b) ** 2) == "3 * (a + b) ** 2"
+
+    # Test equality and factors.
+    assert a ** 2 == a ** 2
+    assert a ** 2 != a ** 3
+    assert hash(a ** 2) == hash(a ** 2)
+    e = (a * b) ** 2
+    assert e.num_factors == 4
+    assert [str(f) for f in e.factors()] == ["a", "b", "a", "b"]
+    assert str(e.factor(3)) == "b"
+    with pytest.raises(IndexError):
+        e.factor(4)
+
+
+def test_square_and_multiply():
+    # This is used for algebras which do not support powers.
+    assert str(_square_and_multiply(a, 1)) == "a"
+    assert str(_square_and_multiply(a, 5)) == "a * a * a * a * a"
+    assert _square_and_multiply(a, 6).num_factors == 6
 
 
 def test_terms():
@@ -81,12 +329,16 @@ def test_terms():
     assert e.num_terms == 4
     assert str(e.term(0)) == "a"
     assert str(e.term(1)) == "a * b"
-    assert str(e.term(2)) == "c * c"
+    assert str(e.term(2)) == "c ** 2"
     assert str(e.term(3)) == "b"
     with pytest.raises(IndexError):
         e.term(4)
     with pytest.raises(IndexError):
         a.term(1)
+    with pytest.raises(IndexError):
+        e.term(-1)
+    assert [str(t) for t in e.terms()] == ["a", "a * b", "c ** 2", "b"]
+    assert list(a.terms()) == [a]
 
 
 def test_factors():
@@ -107,6 +359,8 @@ def test_factors():
         e.factor(4)
     with pytest.raises(IndexError):
         a.factor(1)
+    assert [str(f) for f in e.factors()] == ["2", "a", "c", "b + c"]
+    assert list(a.factors()) == [a]
 
 
 def test_indexing_wrapped():
@@ -124,6 +378,15 @@ def test_indexing_sum():
         e[2]
 
 
+def test_indexing_sum_flattened():
+    e = a + b + c
+    assert str(e[0]) == "a + b"
+    assert str(e[1]) == "c"
+    assert str(e.e1) == "a + b"
+    assert str(e.e2) == "c"
+    assert isinstance(e[0], Sum)
+
+
 def test_indexing_product():
     e = a * b
     assert str(e[0]) == "a"
@@ -176,6 +439,44 @@ def test_new():
         new(Kernel(), Product)
 
 
+def test_new_invalidation():
+    class Kernel(Element):
+        pass
+
+    class SumKernel(Kernel, Sum):
+        pass
+
+    @get_algebra.dispatch
+    def _get_algebra(e: Kernel):
+        return Kernel
+
+    assert new(Kernel(), Sum) == SumKernel
+
+    # Defining a more specific type should invalidate the cache.
+    class SpecialSumKernel(SumKernel):
+        pass
+
+    assert new(Kernel(), Sum) == SpecialSumKernel
+
+    # Defining a type for which a lookup previously failed should also invalidate
+    # the cache.
+    with pytest.raises(RuntimeError):
+        new(Kernel(), Product)
+
+    class ProductKernel(Kernel, Product):
+        pass
+
+    assert new(Kernel(), Product) == ProductKernel
+
+
+def test_new_statistics():
+    new_cache = algebra.algebra.new_cache
+    new(Element(), One)
+    hits, misses = new_cache.hits, new_cache.misses
+    new(Element(), One)
+    assert (new_cache.hits, new_cache.misses) == (hits + 1, misses)
+
+
 def test_filter_most_specific():
     class T1:
         pass
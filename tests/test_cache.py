@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from algebra import EvaluationCache, compile_plan
+from .util import approx, f, g, F, G
+
+calls = []
+
+
+def evaluate_f(e, x):
+    calls.append("f")
+    return np.sin(x)
+
+
+def evaluate_g(e, x):
+    calls.append("g")
+    return x ** 2
+
+
+evaluators = {F: evaluate_f, G: evaluate_g}
+
+
+def test_evaluation_cache():
+    cache = EvaluationCache(max_size=2)
+    with pytest.raises(KeyError):
+        cache.get("a")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # `b` was used least recently.
+    with pytest.raises(KeyError):
+        cache.get("b")
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 2, 1)
+
+    cache.clear()
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses, cache.evictions) == (0, 0, 0)
+
+
+def test_plan_cache():
+    cache = EvaluationCache()
+    x = np.linspace(0, 1, 5)
+    e = f.stretch(2) * g + f
+    plan = compile_plan(e, evaluators, cache=cache)
+
+    del calls[:]
+    approx(plan(x), np.sin(x / 2) * x ** 2 + np.sin(x))
+    assert sorted(calls) == ["f", "f", "g"]
+
+    # Evaluating again should hit the cache for the whole expression.
+    del calls[:]
+    approx(plan(x), np.sin(x / 2) * x ** 2 + np.sin(x))
+    assert calls == []
+
+    # Equal inputs also hit the cache, but other inputs do not.
+    approx(plan(x.copy()), np.sin(x / 2) * x ** 2 + np.sin(x))
+    assert calls == []
+    plan(x + 1)
+    assert sorted(calls) == ["f", "f", "g"]
+
+    # Subexpressions are shared between plans.
+    del calls[:]
+    plan = compile_plan(f.stretch(2) + g, evaluators, cache=cache)
+    approx(plan(x), np.sin(x / 2) + x ** 2)
+    assert calls == []
+
+    # Transformations of the inputs are part of the key.
+    approx(compile_plan(f.stretch(3), evaluators, cache=cache)(x), np.sin(x / 3))
+    assert calls == ["f"]
+
+
+def test_plan_cache_eviction():
+    cache = EvaluationCache(max_size=1)
+    x = np.linspace(0, 1, 5)
+    plan = compile_plan(f + g, evaluators, cache=cache)
+    plan(x)
+    assert len(cache) == 1
+    assert cache.evictions == 2
+
+
+class _Input:
+    """Input without a fingerprint determined by its contents."""
+
+    def __init__(self, x):
+        self.x = x
+
+    def __array__(self, dtype=None):
+        return self.x
+
+    def __pow__(self, power):
+        return self.x ** power
+
+
+def test_plan_cache_bypass():
+    cache = EvaluationCache()
+    plan = compile_plan(f + g, evaluators, cache=cache)
+    x = _Input(np.linspace(0, 1, 5))
+
+    # Inputs could be modified in place without a change of fingerprint, so the
+    # cache must be bypassed.
+    del calls[:]
+    approx(plan(x), np.sin(x.x) + x.x ** 2)
+    x.x = x.x + 1
+    approx(plan(x), np.sin(x.x) + x.x ** 2)
+    assert sorted(calls) == ["f", "f", "g", "g"]
+    assert len(cache) == 0
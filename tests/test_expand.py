@@ -0,0 +1,51 @@
+from algebra import Product, ReversedFunction, expand
+from .util import a, b, c, f, g
+
+
+def test_expand():
+    assert str(expand(a)) == "a"
+    assert str(expand((a + b) * (a + c))) == "a ** 2 + a * c + b * a + b * c"
+    assert str(expand(2 * (a + b) * c)) == "2 * a * c + 2 * b * c"
+    assert str(expand((a + b) ** 2)) == "a ** 2 + 2 * a * b + b ** 2"
+    assert str(expand((a + b) * (a - a))) == "0"
+
+
+def test_expand_canonical():
+    assert expand((a + b) ** 2) == expand(a * a + 2 * a * b + b * b)
+    assert expand((a + b) * (b + a)) == expand((a + b) ** 2)
+    assert expand(a ** 2) == expand(a * a)
+    assert expand((a * b) ** 2) == expand(a * b * a * b)
+    assert expand((2 * a) ** 2 * b) == expand(4 * b * a * a)
+    assert expand((a + b) * (a - b)) == expand(a * a - b * b)
+
+
+def test_expand_wrappers():
+    assert str(expand((f + g).stretch(2) * f)) == "(f > 2) * f + (g > 2) * f"
+    assert str(expand((f + 2 * g).shift(1))) == "f shift 1 + 2 * (g shift 1)"
+    assert str(expand((f + g).select(0))) == "f : [0] + g : [0]"
+    assert str(expand((f + g).diff(0))) == "d(0) f + d(0) g"
+    assert str(expand(ReversedFunction((f + g) * f))) == (
+        "Reversed(f) ** 2 + Reversed(g) * Reversed(f)"
+    )
+
+
+def test_expand_shared():
+    e = a + b
+    for _ in range(3):
+        e = Product(e, e)
+    assert expand(e) == expand((a + b) ** 8)
+    assert expand(e).num_terms == 9
+
+
+def test_expand_deep():
+    e = f + g
+    for _ in range(3000):
+        e = e.transform(abs)
+    assert expand(e).num_terms == 2
+
+
+def test_expand_power_wide():
+    # Repeated squaring with collection keeps the intermediate expansions small.
+    e = expand((a + b + c) ** 12)
+    assert e.num_terms == 91
+    assert e == expand((a + b + c) ** 4 * (a + b + c) ** 8)
@@ -1,8 +1,10 @@
+import gc
+import weakref
+
+import numpy as np
 import pytest
-from plum import dispatch
 
 from algebra import (
-    Function,
     OneFunction,
     ZeroFunction,
     TensorProductFunction,
@@ -13,35 +15,22 @@ from algebra import (
     transform,
     diff,
     reverse,
+    BatchedFunction,
+    ShiftedFunction,
+    SumFunction,
+    collect,
+    simplify,
 )
+from .util import approx, f, g
 
-
-class F(Function):
-    @dispatch
-    def __eq__(self, other: "F"):
-        return True
-
-    def render(self, formatter):
-        return "f"
-
-
-class G(Function):
-    @dispatch
-    def __eq__(self, other: "G"):
-        return True
-
-    def render(self, formatter):
-        return "g"
-
-
-f = F()
-g = G()
 one = OneFunction()
 zero = ZeroFunction()
 
 
 def check_equality(f_method, g_method, arg1, arg2):
+    assert not hasattr(f_method(arg1), "__dict__")
     assert f_method(arg1) == f_method(arg1)
+    assert hash(f_method(arg1)) == hash(f_method(arg1))
     assert f_method(arg1) != f_method(arg1, arg1)
     assert f_method(arg1) != f_method(arg1, arg2)
 
@@ -77,6 +66,8 @@ def test_shift():
     assert str(f.shift(5, 6)) == "f shift (5, 6)"
 
     check_equality(f.shift, g.shift, 4, 5)
+    assert f.shift(np.array([1, 2])) == f.shift(np.array([1, 2]))
+    assert f.shift(np.array([1, 2])) != f.shift(np.array([1, 3]))
 
     # Test grouping.
     assert str(f.shift(2).shift(3)) == "f shift 5"
@@ -166,6 +157,92 @@ def test_tensor_product():
     assert TensorProductFunction(f1) != TensorProductFunction(f1, f2)
     assert TensorProductFunction(f1, f1) == TensorProductFunction(f1, f1)
     assert TensorProductFunction(f1, f2) == TensorProductFunction(f1, f2)
+    assert hash(TensorProductFunction(f1, f2)) == hash(TensorProductFunction(f1, f2))
+
+
+def test_batch():
+    b = f.stretch_batch(np.array([1.0, 2.0, 3.0]))
+    assert isinstance(b, BatchedFunction)
+    assert b.batch_size == 3
+    assert b.num_terms == 3
+    assert str(b.term(1)) == "f > 2.0"
+    assert [str(t) for t in b.terms()] == ["f", "f > 2.0", "f > 3.0"]
+    assert [str(t) for t in f.shift_batch([0.0, 2.0]).terms()] == ["f", "f shift 2.0"]
+    with pytest.raises(IndexError):
+        b.term(3)
+    with pytest.raises(ValueError):
+        BatchedFunction(f, [1, 2], [1, 2, 3], [1, 2])
+
+    assert not hasattr(b, "__dict__")
+    assert b == f.stretch_batch(np.array([1.0, 2.0, 3.0]))
+    assert hash(b) == hash(f.stretch_batch(np.array([1.0, 2.0, 3.0])))
+    assert b != f.stretch_batch(np.array([1.0, 2.0, 4.0]))
+    assert b != f.shift_batch(np.array([1.0, 2.0, 3.0]))
+    assert b != g.stretch_batch(np.array([1.0, 2.0, 3.0]))
+
+    # Test fusion of stretches, shifts, and scales.
+    ones = np.ones(3)
+    assert b.stretch(2).shift(1) == BatchedFunction(f, ones, 2 * b.stretches, ones)
+    assert b.shift(1).stretch(2) == BatchedFunction(f, ones, 2 * b.stretches, 2 * ones)
+    assert 2 * b == b.scale_batch([2])
+    assert b * 2 == b.scale_batch([2])
+    assert b * 1 is b
+    assert b * 0 == zero
+    assert isinstance(b.shift(1, 2), ShiftedFunction)
+
+    # Parameters which apply to all copies broadcast along the trailing dimensions.
+    b2 = f.stretch_batch([1, 2, 3]).stretch(np.array([1, 10, 100]))
+    approx(b2.stretches, [[1, 10, 100], [2, 20, 200], [3, 30, 300]])
+    b2 = f.stretch_batch([1.0, 2.0]).shift(np.array([1.0, 10.0]))
+    approx(b2.stretches, [1, 2])
+    approx(b2.shifts, [[1, 10], [1, 10]])
+
+    # Batching a batch gives every combination of the two batches.
+    b2 = f.scale_batch([1, 2]).scale_batch([3, 4])
+    assert b2.batch_size == 4
+    approx(b2.scales, [3, 4, 6, 8])
+    assert np.sum(b2.scales) == (1 + 2) * (3 + 4)
+    b2 = f.shift_batch([1.0, 2.0]).stretch_batch([3.0, 4.0])
+    assert b2.num_terms == 4
+    approx(b2.stretches, [3, 4, 3, 4])
+    approx(b2.shifts, [3, 4, 6, 8])
+    b2 = f.stretch_batch([1.0, 2.0]).shift_batch([3.0, 4.0])
+    approx(b2.stretches, [1, 1, 2, 2])
+    approx(b2.shifts, [3, 4, 3, 4])
+    b2 = f.stretch_batch(np.ones((2, 3))).stretch_batch([1.0, 2.0])
+    approx(b2.stretches, [[1, 1, 1], [2, 2, 2]] * 2)
+    approx(b2.shifts, [0, 0, 0, 0])
+
+    # Test concatenation.
+    assert b + b.shift(1) == BatchedFunction(
+        f, np.ones(6), [1.0, 2.0, 3.0] * 2, [0.0, 0.0, 0.0, 1.0, 1.0, 1.0]
+    )
+    # Batches with parameters of different shapes cannot be concatenated.
+    b2 = f.stretch_batch(np.ones((2, 3))) + f.stretch_batch([1.0, 2.0])
+    assert isinstance(b2, SumFunction)
+    assert b2.num_terms == 4
+    assert str(b + g.stretch_batch([1])) == str(b) + " + " + str(g.stretch_batch([1]))
+
+    # Collecting like terms does not unroll batches.
+    assert collect(b + g) == b + g
+    assert collect(b + g + b) == 2 * b + g
+    assert simplify(b + g) == b + g
+
+    # Test cancellation.
+    assert zero.stretch_batch([1, 2]) is zero
+    assert str(one.stretch_batch([1, 2])) == "2 * 1"
+    assert str(one.scale_batch([1, 2])) == "3 * 1"
+
+    # Test printing.
+    assert str(f.shift_batch([1, 2])) == (
+        "Batched(f, scales=[1 1], stretches=[1 1], shifts=[1 2])"
+    )
+    assert str(2 * f.shift_batch([1, 2])) == (
+        "Batched(f, scales=[2 2], stretches=[1 1], shifts=[1 2])"
+    )
+    assert str((f + g).shift_batch([1])) == (
+        "Batched(f + g, scales=[1], stretches=[1], shifts=[1])"
+    )
 
 
 def test_reverse():
@@ -182,6 +259,7 @@ def test_reverse():
     assert str(reversed(f)) == "Reversed(f)"
 
     assert reverse(f) == reverse(f)
+    assert hash(reverse(f)) == hash(reverse(f))
     assert reverse(f) != reverse(g)
 
     # Test cancellation.
@@ -192,6 +270,7 @@ def test_reverse():
     assert str(reverse(f + g)) == "Reversed(f) + Reversed(g)"
     assert str(reverse(f * g)) == "Reversed(f) * Reversed(g)"
     assert str(reverse(2 * f)) == "2 * Reversed(f)"
+    assert str(reverse(f ** 2)) == "Reversed(f) ** 2"
 
     # Test synergy with other types.
     assert str(reverse(reverse(f))) == "f"
@@ -210,6 +289,36 @@ def test_reverse():
     assert str(ReversedFunction(f) * g) == "Reversed(f) * g"
 
 
+def test_reverse_memoised():
+    k = f.stretch(2) * g + f.stretch(2)
+    k_reversed = reversed(k)
+    assert reversed(k) is k_reversed
+    assert reversed(k_reversed) is k
+
+    # Test that shared subtrees are reversed once.
+    h = f.stretch(2)
+    k_reversed = reversed(h * g + h)
+    assert k_reversed[0][0] is k_reversed[1]
+
+    # Test that the cache is freed together with the function.
+    k_reversed = weakref.ref(reversed(f.shift(1)))
+    gc.collect()
+    assert k_reversed() is None
+
+    # Test that the cache does not create reference cycles, so the function and its
+    # reversal are freed without collecting cycles.
+    gc.disable()
+    try:
+        k = f.stretch(2) * g + f
+        k_reversed = reversed(k)
+        assert reversed(k_reversed) is k
+        k, k_reversed = weakref.ref(k), weakref.ref(k_reversed)
+        assert k() is None
+        assert k_reversed() is None
+    finally:
+        gc.enable()
+
+
 def test_function_conversion():
     def f1():
         pass
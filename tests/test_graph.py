@@ -0,0 +1,44 @@
+from algebra import Sum, Product, children, rebuild, walk, cse
+from .util import a, b, c, f, g
+
+
+def test_children():
+    assert children(a) == ()
+    assert children(2 * a) == (a,)
+    assert children(a + b + c) == (a, b, c)
+
+
+def test_rebuild():
+    e = f.stretch(2)
+    assert rebuild(e, (f,)) is e
+    e2 = rebuild(e, (g,))
+    assert e2 == g.stretch(2)
+    assert e2.stretches is e.stretches
+    assert rebuild(a + b, (a, c)) == a + c
+
+
+def test_walk():
+    e = Product(a, a + b)
+    assert list(walk(e)) == [a, b, a + b, e]
+
+
+def test_cse():
+    e = f.stretch(2) * g + f.stretch(2) * f
+    assert e[0][0] is not e[1][0]
+    e2, saved = cse(e)
+    assert e2 == e
+    assert saved == 1
+    assert e2[0][0] is e2[1][0]
+    assert e2[1][1] is e2[0][0][0]
+
+    # Running it again should not save anything.
+    e3, saved = cse(e2)
+    assert e3 is e2
+    assert saved == 0
+
+
+def test_cse_shared_sums():
+    e = Product(Sum(a, b), Sum(b, a))
+    e2, saved = cse(e)
+    assert e2[0] is e2[1]
+    assert saved == 1
@@ -1,4 +1,6 @@
-from algebra import One, Zero
+import numpy as np
+
+from algebra import One, Zero, ProductBuilder
 
 from .util import a, b
 
@@ -59,7 +61,8 @@ def test_mul_two():
 
 
 def test_mul_a():
-    assert str(a * a) == "a * a"
+    assert str(a * a) == "a ** 2"
+    assert a * a == a ** 2
 
     assert str(a * Zero()) == "0"
     assert str(Zero() * a) == "0"
@@ -83,11 +86,46 @@ def test_grouping():
     assert str(2 * (2 * a)) == "4 * a"
     assert str((2 * a) * 2) == "4 * a"
 
-    assert str(a * (2 * a)) == "2 * a * a"
-    assert str((2 * a) * a) == "2 * a * a"
+    assert str(a * (2 * a)) == "2 * a ** 2"
+    assert str((2 * a) * a) == "2 * a ** 2"
 
     assert str(a * (2 * b)) == "2 * a * b"
     assert str((2 * b) * a) == "2 * b * a"
 
-    assert str((2 * a) * (2 * a)) == "4 * a * a"
+    assert str((2 * a) * (2 * a)) == "4 * a ** 2"
     assert str((2 * a) * (2 * b)) == "4 * a * b"
+
+
+def test_folding():
+    assert str(a * b * a) == "a ** 2 * b"
+    assert str(a ** 2 * b * a) == "a ** 3 * b"
+    assert str((a * b) * (b * a ** 2)) == "a ** 3 * b ** 2"
+    assert str(a * b * (2 * a)) == "2 * a ** 2 * b"
+
+
+def test_product_builder():
+    builder = ProductBuilder()
+    assert len(builder) == 0
+    builder *= 2
+    builder *= a
+    builder *= b * a
+    builder *= 3 * b ** 2
+    assert len(builder) == 2
+    assert str(builder.build()) == "6 * a ** 2 * b ** 3"
+
+    # Numbers only give a number, unless a template is given.
+    assert ProductBuilder().build() == 1
+    assert str(ProductBuilder(a).build()) == "1"
+    builder = ProductBuilder(a)
+    builder *= b
+    builder *= Zero()
+    assert str(builder.build()) == "0"
+
+
+def test_array_scales():
+    assert a * np.ones(2) == a * np.ones(2)
+    assert hash(a * np.ones(2)) == hash(a * np.ones(2))
+    assert a * np.ones(2) != a * np.ones(3)
+    assert a * np.ones(2) != a * np.array([1.0, 2.0])
+    # Equal scales must be recognised for grouping to fire.
+    assert a * np.ones(2) + a * np.ones(2) == 2 * (a * np.ones(2))
@@ -0,0 +1,41 @@
+import numpy as np
+
+from algebra import normalise, compile_plan
+from .util import approx, f, g, evaluators
+
+
+def test_normalise_stretch_shift():
+    e = f.stretch(2).shift(1).stretch(3)
+    assert normalise(e) == f.stretch(6).shift(3)
+    assert str(normalise(g.shift(1, 2).stretch(2))) == "(g > 2) shift (2, 4)"
+
+    # Check that the normalised function computes the same.
+    x = np.linspace(0, 1, 5)
+    approx(compile_plan(normalise(e), evaluators)(x), compile_plan(e, evaluators)(x))
+
+
+def test_normalise_select():
+    assert str(normalise(f.select([0, 1]).select([3, 1, 2]))) == "f : [3, 1]"
+    assert str(normalise(f.select(None, [1]).select([0, 1], None))) == (
+        "f : ([0, 1], [1])"
+    )
+
+    x = np.random.randn(5, 4)
+    e = f.select([0, 1]).select([3, 1, 2])
+    approx(compile_plan(normalise(e), evaluators)(x), compile_plan(e, evaluators)(x))
+
+
+def test_normalise_transform():
+    e = f.transform(np.exp).transform(np.sin)
+    assert str(normalise(e)) == "f transform exp o sin"
+    assert normalise(e) == normalise(e)
+    assert hash(normalise(e)) == hash(normalise(e))
+    assert normalise(e) != normalise(f.transform(np.sin).transform(np.exp))
+
+    x = np.linspace(0, 1, 5)
+    approx(compile_plan(normalise(e), evaluators)(x), compile_plan(e, evaluators)(x))
+
+
+def test_normalise_nested():
+    e = 2 * f.stretch(2).shift(1).stretch(3) + f * g.shift(1).shift(2)
+    assert str(normalise(e)) == "2 * ((f > 6) shift 3) + f * (g shift 3)"
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from algebra import Element, compile_plan, ZeroFunction, OneFunction
+from .util import f, g, evaluators
+
+x = np.linspace(0, 1, 5)
+y = np.linspace(1, 2, 5)
+
+
+def approx(x, y):
+    np.testing.assert_allclose(x, y, atol=1e-12)
+
+
+def test_plan():
+    e = 2 * f.stretch(2) + f.stretch(2) * g.shift(1) + f.stretch(2) ** 2
+    plan = compile_plan(e, evaluators)
+    sin = np.sin(x / 2)
+    approx(plan(x), 2 * sin + sin * (x - 1) ** 2 + sin ** 2)
+
+    # The plan can be reused with other inputs.
+    sin = np.sin(y / 2)
+    approx(plan(y), 2 * sin + sin * (y - 1) ** 2 + sin ** 2)
+
+    with pytest.raises(ValueError):
+        plan(x, y)
+
+
+def test_plan_common_subexpressions():
+    e = f.stretch(2) + f.stretch(2) * g.stretch(2)
+    # Stretch the inputs, evaluate `f` and `g`, multiply, and add.
+    assert len(compile_plan(e, evaluators)) == 5
+
+
+def test_plan_inputs():
+    approx(compile_plan(f.shift(1, 2), evaluators, 2)(x, y), np.sin(x - 1))
+    approx(compile_plan(g.shift(1, 2), evaluators, 2)(x, y), (y - 2) ** 2)
+    approx(compile_plan(reversed(f), evaluators, 2)(x, y), np.sin(y))
+    approx(compile_plan(f.transform(np.exp), evaluators)(x), np.sin(np.exp(x)))
+    approx(
+        compile_plan(f.select([1]), evaluators)(np.stack((x, y), axis=1)),
+        np.sin(y)[:, None],
+    )
+    approx(
+        compile_plan(f.stretch_batch([1.0, 2.0]), evaluators)(x),
+        np.sin(x) + np.sin(x / 2),
+    )
+
+    e = f.shift_batch([1.0, 2.0]).stretch_batch([3.0, 4.0])
+    approx(
+        compile_plan(e, evaluators)(x),
+        sum(np.sin(x / t - s) for s in [1.0, 2.0] for t in [3.0, 4.0]),
+    )
+
+    with pytest.raises(ValueError):
+        compile_plan(f.shift(1, 2, 3), evaluators, 2)
+
+
+def test_plan_batch():
+    # A batch is evaluated in a constant number of steps.
+    e = f.stretch_batch(np.arange(1.0, 101.0))
+    plan = compile_plan(e, evaluators)
+    assert len(plan) == 3
+    approx(plan(x), sum(np.sin(x / t) for t in range(1, 101)))
+
+    e = (f + g).shift_batch([1.0, 2.0]).scale_batch([3.0, 4.0])
+    approx(
+        compile_plan(e, evaluators, 2)(x, y),
+        7 * sum(np.sin(x - s) + (y - s) ** 2 for s in [1.0, 2.0]),
+    )
+
+    # Test parameters with a feature dimension.
+    xy = np.stack((x, y), axis=1)
+    e = f.stretch_batch(np.array([[1.0, 2.0], [3.0, 4.0]]))
+    approx(
+        compile_plan(e, evaluators)(xy),
+        np.sin(xy / [1.0, 2.0]) + np.sin(xy / [3.0, 4.0]),
+    )
+
+
+def test_plan_batch_per_dimension():
+    xy = np.stack((x, y), axis=1)
+    e = f.stretch_batch([1.0, 2.0]).stretch(np.array([1.0, 10.0])).shift(1.0)
+    approx(
+        compile_plan(e, evaluators)(xy),
+        sum(np.sin((xy - 1) / (t * np.array([1.0, 10.0]))) for t in [1.0, 2.0]),
+    )
+
+
+def test_plan_batch_select():
+    # Selections inside a batch select along the last dimension of the inputs.
+    xy = np.stack((x, y), axis=1)
+    e = f.select(0).stretch_batch([1.0, 2.0])
+    approx(
+        compile_plan(e, evaluators)(xy),
+        (np.sin(x) + np.sin(x / 2))[:, None],
+    )
+
+
+def test_plan_constants():
+    assert compile_plan(OneFunction(), evaluators)(x) == 1
+    assert compile_plan(ZeroFunction(), evaluators)(x) == 0
+    approx(compile_plan(f + 1, evaluators)(x), np.sin(x) + 1)
+
+
+def test_plan_missing_evaluator():
+    with pytest.raises(NotImplementedError):
+        compile_plan(Element(), evaluators)
@@ -1,6 +1,6 @@
 import pytest
 
-from algebra import Scaled, Product
+from algebra import Scaled, Product, Sum
 
 from .util import a, b
 
@@ -12,8 +12,8 @@ from .util import a, b
         (a + (a * b + 2 * a), "a + a * b + 2 * a"),
         (a + 4 * (a * b + 2 * a), "a + 4 * (a * b + 2 * a)"),
         (2 * (a + b), "2 * (a + b)"),
-        ((a + b) * (a + b), "(a + b) * (a + b)"),
-        ((a + b) * (a + b) + a, "(a + b) * (a + b) + a"),
+        ((a + b) * (a + 2 * b), "(a + b) * (a + 2 * b)"),
+        ((a + b) * (a + 2 * b) + a, "(a + b) * (a + 2 * b) + a"),
         # I'm not sure if the below can ever be constructed, but it should be
         # handled sensibly.
         (Product(Scaled(a, 2), a * b), "2 * a * a * b"),
@@ -21,3 +21,34 @@ from .util import a, b
 )
 def test_pretty_printing(e, result):
     assert str(e) == result
+
+
+def test_pretty_printing_deep():
+    e = a
+    for _ in range(5000):
+        e = Scaled(e, 2)
+    assert str(e) == "2 * " * 5000 + "a"
+
+
+def test_pretty_printing_shared():
+    e = a + b
+    for _ in range(10):
+        e = Product(e, e)
+    assert str(e) == " * ".join(["(a + b)"] * 2**10)
+
+
+def test_display_truncation():
+    e = Sum(*[Scaled(a, i) for i in range(1, 101)])
+    assert e.display(max_terms=3) == "1 * a + 2 * a + 3 * a + ..."
+    assert (2 * (a + b) + a * b).display(max_depth=2) == "2 * ... + ... * ..."
+    assert e.display(max_chars=10) == "1 * a + 2 ..."
+    assert e.display(max_chars=1000) == str(e)
+    assert len(repr(Sum(*[Scaled(a, i) for i in range(1, 10_001)]))) < 11_000
+
+
+def test_iter_render():
+    e = 2 * (a + b) + a * b
+    assert "".join(e.iter_render()) == str(e)
+    assert all(len(piece) > 0 for piece in e.iter_render())
+    assert list(a.iter_render()) == ["a"]
+    assert "".join(e.iter_render(max_terms=1)) == e.display(max_terms=1)
@@ -0,0 +1,97 @@
+import copy
+import pickle
+
+import numpy as np
+
+from algebra import Scaled, dumps, loads
+from .util import a, b, approx, f, g
+
+
+def test_serialise():
+    e = 2 * a + a * b
+    assert loads(dumps(e)) == e
+    assert str(loads(dumps(e))) == "2 * a + a * b"
+
+    # Test that caches work after loading.
+    e = loads(dumps(a + b + a * b))
+    assert e.num_terms == 3
+    assert [str(t) for t in e.terms()] == ["a", "b", "a * b"]
+    assert hash(e) == hash(a + b + a * b)
+
+
+def test_serialise_shared():
+    k = f.stretch(2)
+    e = k * g + k * f
+    e2 = loads(dumps(e))
+    assert e2 == e
+    assert e2.es[0].es[0] is e2.es[1].es[0]
+
+    # Check that the shared element is stored only once.
+    assert len(dumps(e)) < len(dumps(k * g)) + len(dumps(f.stretch(2) * f))
+
+
+def test_serialise_arrays():
+    x = np.random.randn(3, 3)
+    e = f.shift(x) + g.stretch(np.arange(3)) + 2 * f.scale_batch(np.ones(4))
+    e2 = loads(dumps(e))
+    assert e2 == e
+    approx(e2.es[0].shifts[0], x)
+    assert e2.es[1].stretches[0].dtype == np.arange(3).dtype
+
+    # Arrays which are shared are stored once.
+    assert len(dumps(f.shift(x) + g.shift(x))) < 1.5 * len(dumps(f.shift(x)))
+
+
+def test_pickle():
+    e = (f + g.shift(1)) * f
+    assert pickle.loads(pickle.dumps(e)) == e
+
+    # Elements which are pickled together share elements.
+    s = f + g
+    e1, e2 = pickle.loads(pickle.dumps([s * f, s * g]))
+    assert e1.es[0] is e2.es[0]
+    assert len(pickle.dumps([s * f, s * g])) < 1.5 * len(pickle.dumps(s * f))
+
+    # Test that deep elements can be pickled.
+    e = a
+    for _ in range(5000):
+        e = Scaled(e, 2)
+    assert str(pickle.loads(pickle.dumps(e))) == "2 * " * 5000 + "a"
+
+
+def test_copy():
+    s = f + g
+    e = s * f
+    e2 = copy.copy(e)
+    assert e2 == e and e2 is not e
+    assert e2.es[0] is s
+    e2 = copy.deepcopy(e)
+    assert e2 == e
+    assert e2.es[0] is not s
+    assert e2.num_factors == 2
+
+
+def test_serialise_sidecar(tmp_path):
+    x = np.random.randn(100, 3)
+    e = f.shift(x) + 2 * g.stretch(np.float64(2)) + f.stretch(np.ones((0, 2)))
+    path = str(tmp_path / "arrays.bin")
+    data = dumps(e, sidecar=path)
+    # The arrays must not be stored in the serialisation itself.
+    assert len(data) < x.nbytes
+
+    e2 = loads(data)
+    assert e2 == e
+    approx(e2.es[0].shifts[0], x)
+    # The arrays are read-only views of the memory-mapped file.
+    assert not e2.es[0].shifts[0].flags.writeable
+    assert not e2.es[0].shifts[0].flags.owndata
+
+    # Test giving the path explicitly.
+    moved = str(tmp_path / "moved.bin")
+    (tmp_path / "arrays.bin").rename(moved)
+    assert loads(data, sidecar=moved) == e
+
+
+def test_serialise_sidecar_empty(tmp_path):
+    path = str(tmp_path / "arrays.bin")
+    assert loads(dumps(a + b, sidecar=path)) == a + b
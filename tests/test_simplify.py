@@ -0,0 +1,82 @@
+import numpy as np
+
+from algebra import (
+    lazy,
+    simplify,
+    compile_plan,
+    SumFunction,
+    PowerFunction,
+    StretchedFunction,
+    ReversedFunction,
+)
+from .util import approx, f, g, evaluators
+
+
+def _build(n):
+    e = 0
+    for i in range(n):
+        e = e + (i % 3) * f.stretch(2).shift(i % 2) + 1 * g - g
+    return (e * f) ** 2
+
+
+def test_lazy_construction():
+    with lazy():
+        assert isinstance(f + 0 * g + f, SumFunction)
+        assert str(f + 0 * g + f) == "f + 0 * g + f"
+        assert isinstance((1 * f) ** 2, PowerFunction)
+        assert isinstance(f.stretch(2).stretch(3)[0], StretchedFunction)
+        assert isinstance(reversed(reversed(f)), ReversedFunction)
+
+        # Lazy mode can be disabled temporarily.
+        with lazy(False):
+            assert str(f + 0 * g + f) == "2 * f"
+        assert str(f + f) == "f + f"
+
+    assert str(f + f) == "2 * f"
+
+
+def test_simplify():
+    with lazy():
+        e = f + 0 * g + f
+        p = (1 * f) ** 2
+        s = f.stretch(2).stretch(3)
+        r = reversed(reversed(f - f))
+    assert str(simplify(e)) == "2 * f"
+    assert str(simplify(p)) == "f ** 2"
+    assert str(simplify(s)) == "f > 6"
+    assert str(simplify(r)) == "0"
+
+
+def test_simplify_agrees_with_eager():
+    with lazy():
+        e_lazy = _build(10)
+    e = _build(10)
+    assert e_lazy != e
+    assert simplify(e_lazy) == simplify(e)
+
+    # Simplification also collects like terms which eager construction misses.
+    assert simplify(e_lazy)[0][0].num_terms == 2
+    assert e[0][0].num_terms == 24
+
+    x = np.linspace(0, 1, 5)
+    approx(
+        compile_plan(simplify(e_lazy), evaluators)(x),
+        compile_plan(e, evaluators)(x),
+    )
+
+
+def test_simplify_shared():
+    with lazy():
+        e = f + f
+        e = e * e + e
+    assert str(simplify(e)) == "4 * f ** 2 + 2 * f"
+
+
+def test_simplify_wide():
+    with lazy():
+        s, p = 0, 1
+        for i in range(2000):
+            s = s + (f if i % 2 else g)
+            p = p * (f if i % 2 else g)
+    assert str(simplify(s)) == "1000 * g + 1000 * f"
+    assert str(simplify(p)) == "g ** 1000 * f ** 1000"
@@ -2,8 +2,18 @@ import operator
 
 import numpy as np
 import pytest
+from plum import Dispatcher
 
-from algebra.util import squeeze, get_subclasses, broadcast, identical, to_tensor
+import algebra.util
+from algebra.util import (
+    squeeze,
+    get_subclasses,
+    broadcast,
+    identical,
+    fingerprint,
+    to_tensor,
+    MethodCache,
+)
 
 
 def test_squeeze():
@@ -64,6 +74,94 @@ def test_identical():
     assert identical(1, 1.0)
     assert identical(1.0, 1.0)
 
-    # Test that more complicated tensors are not identical. That can cause issues with
-    # tracing
-    assert not identical(np.ones(1), np.ones(1))
+    # Test NumPy arrays, which are compared by content.
+    x = np.ones(3)
+    assert identical(x, x)
+    assert identical(np.ones(3), np.ones(3))
+    assert not identical(np.ones(3), np.ones(2))
+    assert not identical(np.ones(3), np.ones(3, dtype=int))
+    assert not identical(np.ones(3), np.array([1.0, 1.0, 2.0]))
+    assert not identical(np.ones(1), 1)
+
+
+def test_fingerprint():
+    class A:
+        pass
+
+    a1 = A()
+    assert fingerprint(a1) == fingerprint(a1)
+
+    # Test numbers.
+    assert fingerprint(1) == fingerprint(1.0)
+
+    # Test tuples and lists.
+    assert fingerprint((1, 2)) == fingerprint((1, 2))
+    assert fingerprint([1, 2]) == fingerprint([1.0, 2])
+
+    # Test unhashable objects.
+    x = [np.ones(2)]
+    assert fingerprint(x) == fingerprint(x)
+
+    # Test NumPy arrays.
+    assert fingerprint(np.ones(2)) == fingerprint(np.ones(2))
+    assert fingerprint(np.ones(2)) != fingerprint(np.ones(3))
+    assert fingerprint(np.ones(2)) != fingerprint(np.ones(2, dtype=int))
+
+    # Test that fingerprints of arrays are cached and released.
+    x = np.ones(2)
+    fingerprint(x)
+    assert id(x) in algebra.util._array_fingerprints
+    key = id(x)
+    del x
+    assert key not in algebra.util._array_fingerprints
+
+
+def test_methodcache():
+    dispatch = Dispatcher()
+
+    @dispatch
+    def f(x):
+        return "object"
+
+    @dispatch
+    def f(x: int):
+        return "int"
+
+    f_cached = MethodCache(f)
+    assert f_cached(1) == "int"
+    assert f_cached(1.0) == "object"
+    assert f_cached.resolve(int) is f_cached.resolve(int)
+
+    # Registering a new method should invalidate the cache.
+    @dispatch
+    def f(x: float):
+        return "float"
+
+    assert f_cached(1) == "int"
+    assert f_cached(1.0) == "float"
+
+    # Also test invalidation if the function is called directly first.
+    @dispatch
+    def f(x: int):
+        return "new int"
+
+    assert f(1) == "new int"
+    assert f_cached(1) == "new int"
+
+    # Clearing the cache of the function should invalidate the cache too.
+    version = f_cached.version
+    f.clear_cache()
+    assert f_cached(1) == "new int"
+    assert f_cached.version == version + 1
+
+    # The cache of the function itself must be left alone.
+    assert all(isinstance(key, tuple) for key in f._cache)
+
+
+def test_methodcache_unsupported():
+    def f(x):
+        return x + 1
+
+    f_cached = MethodCache(f)
+    assert f_cached(1) == 2
+    assert f_cached.resolve(int) is f
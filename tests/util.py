@@ -1,9 +1,10 @@
+import numpy as np
 from numpy.testing import assert_allclose
 from plum import dispatch
 
-from algebra import Element
+from algebra import Element, Function
 
-__all__ = ["approx", "a", "b", "c"]
+__all__ = ["approx", "a", "b", "c", "F", "G", "f", "g", "evaluators"]
 
 approx = assert_allclose
 
@@ -45,3 +46,31 @@ class C(Element):
 
 
 c = C()
+
+
+# Some atomic functions to test with:
+
+
+class F(Function):
+    @dispatch
+    def __eq__(self, other: "F"):
+        return True
+
+    def render(self, formatter):
+        return "f"
+
+
+class G(Function):
+    @dispatch
+    def __eq__(self, other: "G"):
+        return True
+
+    def render(self, formatter):
+        return "g"
+
+
+f = F()
+g = G()
+
+# Evaluators of the above functions for :func:`algebra.compile_plan`:
+evaluators = {F: lambda e, *xs: np.sin(xs[0]), G: lambda e, *xs: xs[-1] ** 2}